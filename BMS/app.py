@@ -14,6 +14,7 @@ if not os.path.exists("logs"):
     os.makedirs("logs")
 
 from utils.auth_guard import is_logged_in, is_admin, get_current_user
+from utils.services import get_auth_service
 
 # --- PAGE DEFINITIONS ---
 def login_page():
@@ -46,9 +47,7 @@ def login_page():
             else:
                 with st.spinner("Authenticating..."):
                     try:
-                        from core.services.authentication_service import AuthenticationService
-                        auth = AuthenticationService()
-                        result = auth.login(username, password, ip_address="127.0.0.1")
+                        result = get_auth_service().login(username, password, ip_address="127.0.0.1")
 
                         if result.get("success"):
                             st.session_state["session_data"] = {
@@ -112,6 +112,11 @@ class Account:
     status: AccountStatus = AccountStatus.ACTIVE
     branch_code: Optional[str] = None
     created_at: Optional[datetime] = None
+    
+    def __post_init__(self):
+        # Normalize status so callers can compare by enum identity
+        if not isinstance(self.status, AccountStatus):
+            self.status = AccountStatus(str(self.status).lower())
 
 @dataclass
 class Transaction:
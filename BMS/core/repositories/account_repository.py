@@ -6,11 +6,20 @@ Handles database operations for accounts table
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from datetime import datetime
+import threading
+import time
 
 from core.repositories.base_repository import BaseRepository
 from core.models.entities import Account, AccountType, AccountStatus
 from utils.exceptions import AccountNotFoundException, ValidationException, InsufficientFundsException
 
+# Short-lived read-through cache for inquiry endpoints (account_id -> (expires_at, Account))
+ACCOUNT_CACHE_TTL_SECONDS = 5.0
+ACCOUNT_CACHE_MAX_ENTRIES = 2048
+_ttl_cache: Dict[int, tuple] = {}
+_ttl_cache_lock = threading.Lock()
+
+
 class AccountRepository(BaseRepository):
     """Repository for accounts table operations"""
     
@@ -46,6 +55,37 @@ class AccountRepository(BaseRepository):
         
         return self._dict_to_account(account_data)
     
+    def find_account_by_id_cached(self, account_id: int) -> Optional[Account]:
+        """Find account by ID through the short-lived TTL cache (read-only inquiries only)"""
+        now = time.monotonic()
+        entry = _ttl_cache.get(account_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        
+        account = self.find_account_by_id(account_id)
+        if account:
+            with _ttl_cache_lock:
+                if len(_ttl_cache) >= ACCOUNT_CACHE_MAX_ENTRIES:
+                    self._evict_expired(now)
+                _ttl_cache[account_id] = (now + ACCOUNT_CACHE_TTL_SECONDS, account)
+        return account
+    
+    def update(self, record_id: int, data: Dict[str, Any]) -> bool:
+        """Update account and evict it from the account caches"""
+        self._invalidate(record_id)
+        try:
+            return super().update(record_id, data)
+        finally:
+            self._invalidate(record_id)
+    
+    def delete(self, record_id: int) -> bool:
+        """Delete account and evict it from the account caches"""
+        self._invalidate(record_id)
+        try:
+            return super().delete(record_id)
+        finally:
+            self._invalidate(record_id)
+    
     def find_by_account_number(self, account_number: str) -> Optional[Account]:
         """Find account by account number"""
         if not account_number:
@@ -62,6 +102,15 @@ class AccountRepository(BaseRepository):
         accounts_data = self.find_by_field('user_id', user_id)
         return [self._dict_to_account(account_data) for account_data in accounts_data]
     
+    def find_by_user_or_account_id(self, value: int) -> List[Account]:
+        """Accounts owned by user `value` plus the account whose ID is `value`, in one query"""
+        try:
+            query = f"SELECT * FROM {self.table_name} WHERE user_id = %s OR account_id = %s"
+            results = self.db.execute_query(query, (value, value), fetch_all=True)
+            return [self._dict_to_account(account_data) for account_data in results or []]
+        except Exception as e:
+            raise ValidationException(f"Error searching accounts: {str(e)}")
+    
     def get_active_accounts_by_customer(self, user_id: int) -> List[Account]:
         """Get active accounts for a customer"""
         try:
@@ -75,6 +124,31 @@ class AccountRepository(BaseRepository):
         """Update account balance"""
         return self.update(account_id, {'balance': new_balance})
     
+    def update_balances_bulk(self, updates: Dict[int, Decimal]) -> bool:
+        """Update several account balances in a single UPDATE statement"""
+        if not updates:
+            return False
+        
+        account_ids = list(updates)
+        for account_id in account_ids:
+            self._invalidate(account_id)
+        try:
+            cases = " ".join("WHEN %s THEN %s" for _ in account_ids)
+            placeholders = ", ".join(["%s"] * len(account_ids))
+            query = (
+                f"UPDATE {self.table_name} SET balance = CASE {self.primary_key} {cases} END "
+                f"WHERE {self.primary_key} IN ({placeholders})"
+            )
+            params = [value for account_id in account_ids for value in (account_id, updates[account_id])]
+            params.extend(account_ids)
+            self.db.execute_query(query, tuple(params))
+            return True
+        except Exception as e:
+            raise ValidationException(f"Error updating balances: {str(e)}")
+        finally:
+            for account_id in account_ids:
+                self._invalidate(account_id)
+    
     def get_account_balance(self, account_id: int) -> Decimal:
         """Get current account balance"""
         account_data = self.find_by_id(account_id)
@@ -121,6 +195,10 @@ class AccountRepository(BaseRepository):
         available_balance = account.balance + account.od_limit
         return available_balance >= amount
     
+    def validate_sufficient_funds_on(self, account: Account, amount: Decimal) -> bool:
+        """Validate sufficient funds (including overdraft) on an already-loaded account"""
+        return account.balance + account.od_limit >= amount
+    
     def get_available_balance(self, account_id: int) -> Decimal:
         """Get available balance including overdraft limit"""
         account = self.find_account_by_id(account_id)
@@ -154,6 +232,36 @@ class AccountRepository(BaseRepository):
         except Exception as e:
             raise ValidationException(f"Error getting low balance accounts: {str(e)}")
     
+    def get_dashboard_rows(self, user_id: int, history_limit: int = 5) -> Dict[str, Any]:
+        """Fetch customer, active accounts and recent primary-account transactions on one connection"""
+        try:
+            with self.db.get_connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    cursor.execute("SELECT * FROM customers WHERE user_id = %s", (user_id,))
+                    customer = cursor.fetchone()
+                    
+                    cursor.execute(
+                        f"SELECT * FROM {self.table_name} WHERE user_id = %s AND status = 'active' "
+                        f"ORDER BY {self.primary_key}",
+                        (user_id,)
+                    )
+                    accounts = cursor.fetchall()
+                    
+                    transactions = []
+                    if accounts:
+                        cursor.execute(
+                            "SELECT * FROM transactions WHERE account_id = %s ORDER BY txn_time DESC LIMIT %s",
+                            (accounts[0][self.primary_key], history_limit)
+                        )
+                        transactions = cursor.fetchall()
+                finally:
+                    cursor.close()
+            
+            return {'customer': customer, 'accounts': accounts, 'transactions': transactions}
+        except Exception as e:
+            raise ValidationException(f"Error loading dashboard data: {str(e)}")
+    
     def get_account_summary(self, account_id: int) -> Dict[str, Any]:
         """Get comprehensive account summary"""
         account = self.find_account_by_id(account_id)
@@ -173,6 +281,19 @@ class AccountRepository(BaseRepository):
             'branch_code': account.branch_code
         }
     
+    def _invalidate(self, account_id: int):
+        """Remove an account from the TTL cache"""
+        with _ttl_cache_lock:
+            _ttl_cache.pop(account_id, None)
+    
+    @staticmethod
+    def _evict_expired(now: float):
+        """Drop expired TTL entries, clearing everything if the cache is still full"""
+        for key in [k for k, (expires_at, _) in _ttl_cache.items() if expires_at <= now]:
+            del _ttl_cache[key]
+        if len(_ttl_cache) >= ACCOUNT_CACHE_MAX_ENTRIES:
+            _ttl_cache.clear()
+    
     def _log_freeze_action(self, account_id: int, action: str, reason: str, performed_by: int):
         """Log account freeze/unfreeze action"""
         try:
@@ -2,7 +2,7 @@
 Audit Repository
 Handles database operations for audit_logs table
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from core.repositories.base_repository import BaseRepository
 
 class AuditRepository(BaseRepository):
@@ -21,6 +21,13 @@ class AuditRepository(BaseRepository):
         }
         return self.create(log_data)
     
+    def log_actions_bulk(self, rows: List[Tuple[int, str, str, str]]) -> int:
+        """Insert many (actor_id, role, action, details) audit rows in one statement"""
+        if not rows:
+            return 0
+        query = f"INSERT INTO {self.table_name} (actor_id, role, action, details) VALUES (%s, %s, %s, %s)"
+        return self.db.execute_many(query, rows)
+    
     def get_recent_logs(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent audit logs for admin display"""
         query = f"SELECT * FROM {self.table_name} ORDER BY created_at DESC LIMIT %s"
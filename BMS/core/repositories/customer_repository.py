@@ -52,6 +52,19 @@ class CustomerRepository(BaseRepository):
         
         return self._dict_to_customer(customer_data)
     
+    def find_by_ids(self, user_ids: List[int]) -> Dict[int, Customer]:
+        """Find customers for many user IDs in one query, keyed by user ID"""
+        if not user_ids:
+            return {}
+        
+        try:
+            placeholders = ', '.join(['%s'] * len(user_ids))
+            query = f"SELECT * FROM {self.table_name} WHERE {self.primary_key} IN ({placeholders})"
+            results = self.db.execute_query(query, tuple(user_ids), fetch_all=True)
+            return {row['user_id']: self._dict_to_customer(row) for row in results or []}
+        except Exception as e:
+            raise ValidationException(f"Error finding customers: {str(e)}")
+    
     def find_by_phone(self, phone: str) -> Optional[Customer]:
         """Find customer by phone number"""
         if not phone:
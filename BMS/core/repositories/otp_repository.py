@@ -97,6 +97,15 @@ class OTPRepository(BaseRepository):
         except Exception as e:
             raise ValidationException(f"Error getting user OTPs: {str(e)}")
     
+    def get_last_otp_time(self, user_id: int) -> Optional[datetime]:
+        """Get when the most recent OTP was issued to a user"""
+        try:
+            query = f"SELECT MAX(created_at) AS last_sent FROM {self.table_name} WHERE user_id = %s"
+            result = self.db.execute_query(query, (user_id,), fetch_one=True)
+            return result['last_sent'] if result else None
+        except Exception as e:
+            raise ValidationException(f"Error getting last OTP time: {str(e)}")
+    
     def get_active_otp(self, user_id: int) -> Optional[OTPLog]:
         """Get the most recent active (unused, non-expired) OTP for a user"""
         try:
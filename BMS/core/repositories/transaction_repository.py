@@ -19,23 +19,7 @@ class TransactionRepository(BaseRepository):
     
     def create_transaction(self, transaction: Transaction) -> int:
         """Create a new transaction"""
-        if not transaction.account_id or transaction.amount <= 0:
-            raise ValidationException("Account ID and positive amount are required")
-        
-        transaction_data = {
-            'account_id': transaction.account_id,
-            'related_account_id': transaction.related_account_id,
-            'txn_type': transaction.txn_type,
-            'amount': transaction.amount,
-            'balance_after_txn': transaction.balance_after_txn,
-            'currency': transaction.currency,
-            'txn_time': transaction.txn_time or datetime.now(),
-            'reference': transaction.reference,
-            'narration': transaction.narration,
-            'created_by': transaction.created_by
-        }
-        
-        return self.create(transaction_data)
+        return self.create(self._transaction_to_dict(transaction))
     
     def find_transaction_by_id(self, txn_id: int) -> Optional[Transaction]:
         """Find transaction by ID"""
@@ -136,6 +120,21 @@ class TransactionRepository(BaseRepository):
         except Exception as e:
             raise ValidationException(f"Error getting transaction summary: {str(e)}")
     
+    def get_amount_by_type(self, account_id: int, days: int = 30) -> Dict[str, Decimal]:
+        """Total amount per transaction type for an account over the last N days"""
+        try:
+            query = f"""
+                SELECT txn_type, SUM(amount) as total_amount
+                FROM {self.table_name} 
+                WHERE account_id = %s 
+                AND txn_time >= DATE_SUB(NOW(), INTERVAL %s DAY)
+                GROUP BY txn_type
+            """
+            results = self.db.execute_query(query, (account_id, days), fetch_all=True)
+            return {row['txn_type']: row['total_amount'] or Decimal('0.00') for row in results or []}
+        except Exception as e:
+            raise ValidationException(f"Error getting transaction type summary: {str(e)}")
+    
     def get_monthly_transactions(self, account_id: int, year: int, month: int) -> List[Transaction]:
         """Get transactions for a specific month"""
         try:
@@ -211,6 +210,24 @@ class TransactionRepository(BaseRepository):
         except Exception as e:
             raise ValidationException(f"Error searching transactions: {str(e)}")
     
+    def _transaction_to_dict(self, transaction: Transaction) -> Dict[str, Any]:
+        """Validate a Transaction and convert it to a column dictionary"""
+        if not transaction.account_id or transaction.amount <= 0:
+            raise ValidationException("Account ID and positive amount are required")
+        
+        return {
+            'account_id': transaction.account_id,
+            'related_account_id': transaction.related_account_id,
+            'txn_type': transaction.txn_type,
+            'amount': transaction.amount,
+            'balance_after_txn': transaction.balance_after_txn,
+            'currency': transaction.currency,
+            'txn_time': transaction.txn_time or datetime.now(),
+            'reference': transaction.reference,
+            'narration': transaction.narration,
+            'created_by': transaction.created_by
+        }
+    
     def _dict_to_transaction(self, txn_data: dict) -> Transaction:
         """Convert dictionary to Transaction object"""
         return Transaction(
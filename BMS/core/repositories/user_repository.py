@@ -144,6 +144,16 @@ class UserRepository(BaseRepository):
         users_data = self.find_all()
         return [self._dict_to_user(user_data) for user_data in users_data]
     
+    def get_page(self, offset: int, limit: int) -> List[User]:
+        """Get one page of users ordered by ID (for admin user management)"""
+        query = f"SELECT * FROM {self.table_name} ORDER BY {self.primary_key} LIMIT %s OFFSET %s"
+        users_data = self.db.execute_query(query, (limit, offset), fetch_all=True) or []
+        return [self._dict_to_user(user_data) for user_data in users_data]
+    
+    def count_all(self) -> int:
+        """Total number of users"""
+        return self.count()
+    
     def get_users_by_status(self, status: str) -> List[User]:
         """Get users by registration status"""
         users_data = self.find_by_field('registration_status', status)
@@ -147,6 +147,7 @@ class AccountService:
 
             # 5. Save to database
             account_id = self.account_repo.create_account(account)
+            account.account_id = account_id
 
             LoggingUtils.log_business_event(
                 "auto_account_created",
@@ -167,6 +168,7 @@ class AccountService:
                 'success': True,
                 'account_id': account_id,
                 'account_number': account_number,
+                'account': self._account_to_summary(account),
                 'message': 'Initial Savings account created successfully'
             }
 
@@ -212,19 +214,38 @@ class AccountService:
         else:
             accounts = self.account_repo.find_by_customer(user_id)
         
-        account_list = []
-        for account in accounts:
-            account_list.append({
-                'account_id': account.account_id,
-                'account_number': account.account_number,
-                'account_type': account.account_type.value,
-                'balance': account.balance,
-                'available_balance': account.balance + account.od_limit,
-                'status': account.status.value,
-                'opening_date': account.opening_date
-            })
+        return [self._account_to_summary(account) for account in accounts]
+    
+    def search_accounts_by_int(self, value: int) -> List[Dict[str, Any]]:
+        """Admin search: all accounts of user `value`, else the account with ID `value`"""
+        accounts = self.account_repo.find_by_user_or_account_id(value)
+        owned = [account for account in accounts if account.user_id == value]
+        return [self._account_to_summary(account) for account in owned or accounts]
+    
+    def get_dashboard_bundle(self, user_id: int, history_limit: int = 5) -> Dict[str, Any]:
+        """Customer profile, active accounts and recent primary-account history in one fetch"""
+        rows = self.account_repo.get_dashboard_rows(user_id, history_limit)
+        
+        customer = self.customer_repo._dict_to_customer(rows['customer']) if rows['customer'] else None
+        accounts = [
+            self._account_to_summary(self.account_repo._dict_to_account(row))
+            for row in rows['accounts']
+        ]
+        recent_txns = [
+            {
+                'txn_id': row['txn_id'],
+                'reference': row.get('reference'),
+                'txn_type': row['txn_type'],
+                'amount': row['amount'],
+                'balance_after_txn': row['balance_after_txn'],
+                'narration': row.get('narration'),
+                'txn_time': row['txn_time'],
+                'related_account': row.get('related_account_id')
+            }
+            for row in rows['transactions']
+        ]
         
-        return account_list
+        return {'customer': customer, 'accounts': accounts, 'recent_txns': recent_txns}
     
     def check_balance(self, account_id: int) -> Dict[str, Any]:
         """Check account balance and available funds"""
@@ -439,6 +460,18 @@ class AccountService:
         
         return low_balance_accounts
     
+    def _account_to_summary(self, account: Account) -> Dict[str, Any]:
+        """Convert Account to the summary dict used by customer-facing views"""
+        return {
+            'account_id': account.account_id,
+            'account_number': account.account_number,
+            'account_type': account.account_type.value,
+            'balance': account.balance,
+            'available_balance': account.balance + account.od_limit,
+            'status': account.status.value,
+            'opening_date': account.opening_date
+        }
+    
     def _get_account_type_config(self, account_type: AccountType, monthly_income: Decimal = None) -> Dict[str, Any]:
         """Get configuration for account type"""
         configs = {
@@ -3,25 +3,114 @@ Audit Service
 Business logic for system-wide auditing and logging
 """
 import json
+import atexit
+import logging
+import threading
+from collections import deque
 from typing import Any, Dict
 from core.repositories.audit_repository import AuditRepository
 
+logger = logging.getLogger(__name__)
+
 class AuditService:
     """Service class for auditing critical system actions"""
     
+    # Deferred writes are flushed every FLUSH_INTERVAL seconds or FLUSH_BATCH events
+    FLUSH_INTERVAL = 0.05
+    FLUSH_BATCH = 100
+    # Failed writes stay queued; the flusher backs off up to MAX_BACKOFF seconds between retries
+    MAX_BACKOFF = 30.0
+    
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(AuditService, cls).__new__(cls)
             cls._instance.repo = AuditRepository()
+            cls._instance._queue = deque()
+            cls._instance._wakeup = threading.Event()
+            cls._instance._flush_lock = threading.Lock()
+            cls._instance._flusher = None
+            cls._instance._failures = 0
         return cls._instance
     
     def log(self, actor_id: int, role: str, action: str, details: Any = None):
         """Log a system action with optional structured details"""
         details_str = json.dumps(details) if details else None
         return self.repo.log_action(actor_id, role, action, details_str)
-
+    
+    def enqueue(self, actor_id: int, role: str, action: str, details: Any = None):
+        """Queue a system action for a batched background write"""
+        details_str = json.dumps(details) if details else None
+        self._queue.append((actor_id, role, action, details_str))
+        self._ensure_flusher()
+        if len(self._queue) >= self.FLUSH_BATCH and not self._failures:
+            self._wakeup.set()
+    
+    def flush(self) -> int:
+        """Write up to FLUSH_BATCH queued audit events as a single multi-row insert.
+        
+        If the bulk insert fails the batch is retried row by row; rows that still
+        cannot be written go back to the front of the queue, so nothing is dropped.
+        """
+        with self._flush_lock:
+            rows = []
+            while self._queue and len(rows) < self.FLUSH_BATCH:
+                rows.append(self._queue.popleft())
+            if not rows:
+                return 0
+            try:
+                written = self.repo.log_actions_bulk(rows)
+                self._failures = 0
+                return written
+            except Exception as e:
+                logger.error(f"Bulk write of {len(rows)} audit events failed, retrying row by row: {e}")
+            
+            for i, row in enumerate(rows):
+                try:
+                    self.repo.log_action(*row)
+                except Exception as e:
+                    # Audit failures must never break the request that produced them; keep the rows for a retry
+                    self._queue.extendleft(reversed(rows[i:]))
+                    self._failures += 1
+                    logger.error(f"Audit write failed, {len(rows) - i} events requeued: {e}")
+                    return i
+            self._failures = 0
+            return len(rows)
+    
     def get_latest_activity(self, count: int = 15):
         """Fetch latest activity for admin dashboard"""
+        self._drain()
         return self.repo.get_recent_logs(count)
+    
+    def _ensure_flusher(self):
+        """Start the background flusher thread on first use"""
+        if self._flusher is not None:
+            return
+        with self._flush_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name='audit-flusher', daemon=True)
+                self._flusher.start()
+                atexit.register(self._shutdown)
+    
+    def _run_flusher(self):
+        """Background loop draining the audit queue"""
+        while True:
+            delay = self.FLUSH_INTERVAL
+            if self._failures:
+                delay = min(self.FLUSH_INTERVAL * 2 ** min(self._failures, 10), self.MAX_BACKOFF)
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            self._drain()
+    
+    def _drain(self):
+        """Flush until the queue is empty"""
+        while self._queue:
+            if not self.flush():
+                break
+    
+    def _shutdown(self):
+        """Final drain at interpreter exit; anything still unwritten is logged in full"""
+        self._drain()
+        for row in list(self._queue):
+            logger.critical(f"Unwritten audit event at shutdown: {row}")
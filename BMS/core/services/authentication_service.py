@@ -10,17 +10,21 @@ import secrets
 from core.repositories.user_repository import UserRepository
 from core.repositories.otp_repository import OTPRepository
 from core.repositories.customer_repository import CustomerRepository
-from core.models.entities import User, UserRole, Customer, RegistrationStatus
+from core.models.entities import User, UserRole, Customer, RegistrationStatus, OTPLog
 from utils.exceptions import (
     AuthenticationException, ValidationException, 
-    InvalidOTPException, AuthorizationException
+    InvalidOTPException, AuthorizationException, RateLimitException
 )
 from utils.validators import BankingValidator
 from utils.helpers import SecurityUtils, LoggingUtils
+from utils.rate_limiter import RateLimiter
 
 class AuthenticationService:
     """Service class for authentication and security operations"""
     
+    MAX_OTP_ATTEMPTS = 3
+    OTP_RESEND_COOLDOWN_SECONDS = 30
+    
     def __init__(self):
         self.user_repo = UserRepository()
         self.otp_repo = OTPRepository()
@@ -28,6 +32,10 @@ class AuthenticationService:
         from core.services.account_service import AccountService
         self.account_svc = AccountService()
         self.active_sessions = {}  # In production, use Redis or database
+        # OTP throttles keyed by ('user', id) and ('ip', address)
+        self.otp_verify_limiter = RateLimiter([(3, 60), (10, 3600)], "Too many OTP attempts")
+        self.otp_generate_limiter = RateLimiter([(5, 60)], "Too many OTP requests")
+        self._otp_failures = {}  # otp_id -> (user_id, wrong guesses, expires_at)
     
     def login(self, username: str, password: str, ip_address: str = None) -> Dict[str, Any]:
         """Authenticate user login"""
@@ -274,12 +282,25 @@ class AuthenticationService:
             )
             raise
     
-    def verify_registration_otp(self, user_id: int, otp_code: str) -> Dict[str, Any]:
+    def verify_registration_otp(self, user_id: int, otp_code: str, client_ip: str = None) -> Dict[str, Any]:
         """Verify OTP during registration and upgrade status to pending_kyc"""
         try:
+            self._throttle(self.otp_verify_limiter, user_id, client_ip)
             BankingValidator.validate_otp(otp_code)
             
-            is_valid = self.otp_repo.validate_otp(user_id, otp_code)
+            # Attempts are tracked against the active OTP; locking it out marks it used in the DB
+            active_otp = self.otp_repo.get_active_otp(user_id)
+            if not active_otp:
+                self._forget_otp_failures(user_id)
+                raise InvalidOTPException(
+                    "OTP expired or locked. Please request a new OTP.", remaining_attempts=0, locked=True
+                )
+            
+            try:
+                is_valid = self.otp_repo.validate_otp(user_id, otp_code)
+            except InvalidOTPException:
+                raise self._record_otp_failure(user_id, active_otp)
+            self._otp_failures.pop(active_otp.otp_id, None)
             
             if is_valid:
                 # Upgrade registration status
@@ -601,15 +622,28 @@ class AuthenticationService:
             )
             raise
     
-    def generate_otp(self, user_id: int, operation_type: str = "general") -> str:
+    def generate_otp(self, user_id: int, operation_type: str = "general", client_ip: str = None) -> str:
         """Generate OTP for user"""
         try:
+            self._throttle(self.otp_generate_limiter, user_id, client_ip)
+            
+            # Per-user cooldown since the last OTP issued (persisted in otp_log)
+            last_sent = self.otp_repo.get_last_otp_time(user_id)
+            if last_sent:
+                elapsed = (datetime.now() - last_sent).total_seconds()
+                if elapsed < self.OTP_RESEND_COOLDOWN_SECONDS:
+                    retry_after = int(self.OTP_RESEND_COOLDOWN_SECONDS - elapsed) + 1
+                    raise RateLimitException(
+                        f"Please wait {retry_after}s before requesting another OTP.", retry_after=retry_after
+                    )
+            
             # Check rate limit
             if not self.otp_repo.check_rate_limit(user_id):
                 raise ValidationException("Too many OTP requests. Please try again later.")
             
-            # Generate OTP
+            # Generate OTP; guesses counted against earlier codes no longer matter
             otp_code = self.otp_repo.generate_otp(user_id, expiry_minutes=5)
+            self._forget_otp_failures(user_id)
             
             # Log OTP generation
             LoggingUtils.log_security_event(
@@ -778,4 +812,45 @@ class AuthenticationService:
         for token in tokens_to_remove:
             del self.active_sessions[token]
         
-        return len(tokens_to_remove)
\ No newline at end of file
+        return len(tokens_to_remove)
+    
+    def _record_otp_failure(self, user_id: int, otp: OTPLog) -> InvalidOTPException:
+        """Count a wrong OTP guess, locking the OTP once the attempt budget is spent"""
+        self._prune_otp_failures()
+        otp_id = otp.otp_id
+        failures = self._otp_failures.get(otp_id, (user_id, 0, None))[1] + 1
+        remaining = self.MAX_OTP_ATTEMPTS - failures
+        
+        if remaining <= 0:
+            self.otp_repo.invalidate_user_otps(user_id)
+            self._forget_otp_failures(user_id)
+            LoggingUtils.log_security_event(
+                "otp_locked",
+                user_id=user_id,
+                details={'otp_id': otp_id, 'attempts': failures}
+            )
+            return InvalidOTPException(
+                "Too many wrong attempts. Please request a new OTP.", remaining_attempts=0, locked=True
+            )
+        
+        self._otp_failures[otp_id] = (user_id, failures, otp.expires_at)
+        return InvalidOTPException(
+            f"Invalid or expired OTP. {remaining} attempt(s) left.", remaining_attempts=remaining
+        )
+    
+    def _forget_otp_failures(self, user_id: int):
+        """Drop guess counters for a user's OTPs once they are invalidated or superseded"""
+        for otp_id in [k for k, (uid, _, _) in self._otp_failures.items() if uid == user_id]:
+            self._otp_failures.pop(otp_id, None)
+    
+    def _prune_otp_failures(self):
+        """Drop guess counters for OTPs that have expired"""
+        now = datetime.now()
+        for otp_id in [k for k, (_, _, exp) in self._otp_failures.items() if exp and exp <= now]:
+            self._otp_failures.pop(otp_id, None)
+    
+    def _throttle(self, limiter: RateLimiter, user_id: int, client_ip: str = None):
+        """Apply a rate limiter per user and, when known, per client IP"""
+        limiter.hit(('user', user_id))
+        if client_ip:
+            limiter.hit(('ip', client_ip))
\ No newline at end of file
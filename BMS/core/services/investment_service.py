@@ -7,8 +7,10 @@ Interest Rules:
 
 Tenure: Must be one of ALLOWED_TENURES = [6, 12, 24, 36] months.
 """
+from bisect import bisect_left
 from decimal import Decimal
 from datetime import date
+from functools import lru_cache
 from typing import List
 from dateutil.relativedelta import relativedelta
 
@@ -38,6 +40,43 @@ RD_INTEREST_SLABS = [
 RD_DEFAULT_RATE = Decimal("7.00")            # > ₹20,000/mo → 7.0% p.a.
 
 
+# Slab limits are inclusive upper bounds, so the first limit >= amount (bisect_left)
+# picks the slab; past the last limit the default rate applies.
+_FD_LIMITS, _FD_RATES = zip(*sorted(FD_INTEREST_SLABS))
+_FD_RATES += (FD_DEFAULT_RATE,)
+_RD_LIMITS, _RD_RATES = zip(*sorted(RD_INTEREST_SLABS))
+_RD_RATES += (RD_DEFAULT_RATE,)
+
+
+# Pure slab/maturity math, memoized: the FD/RD forms and calculator re-run these
+# with the same inputs on every Streamlit rerun.
+@lru_cache(maxsize=512)
+def _fd_rate(principal: Decimal) -> Decimal:
+    return _FD_RATES[bisect_left(_FD_LIMITS, principal)]
+
+
+@lru_cache(maxsize=512)
+def _rd_rate(installment: Decimal) -> Decimal:
+    return _RD_RATES[bisect_left(_RD_LIMITS, installment)]
+
+
+@lru_cache(maxsize=512)
+def _fd_maturity(principal: Decimal, rate: Decimal, tenure_months: int) -> Decimal:
+    maturity = principal * (1 + rate / 100) ** (Decimal(str(tenure_months)) / 12)
+    return round(maturity, 2)
+
+
+@lru_cache(maxsize=512)
+def _rd_maturity(installment: Decimal, rate: Decimal, tenure_months: int) -> Decimal:
+    monthly_rate = rate / Decimal("1200")
+    n = tenure_months
+    if monthly_rate > 0:
+        maturity = installment * ((1 + monthly_rate) ** n - 1) / monthly_rate * (1 + monthly_rate)
+    else:
+        maturity = installment * n
+    return round(maturity, 2)
+
+
 class InvestmentService:
     def __init__(self):
         self.fd_repo  = FDAccountRepository()
@@ -48,37 +87,24 @@ class InvestmentService:
     # ── Slab Rate Helpers ──────────────────────────────────────────────────────
     def get_fd_rate(self, principal: Decimal) -> Decimal:
         """Return fixed FD annual rate based on principal slab. Tenure-independent."""
-        for threshold, rate in FD_INTEREST_SLABS:
-            if principal <= threshold:
-                return rate
-        return FD_DEFAULT_RATE
+        return _fd_rate(principal)
 
     def get_rd_rate(self, installment: Decimal) -> Decimal:
         """Return fixed RD annual rate based on monthly installment slab. Tenure-independent."""
-        for threshold, rate in RD_INTEREST_SLABS:
-            if installment <= threshold:
-                return rate
-        return RD_DEFAULT_RATE
+        return _rd_rate(installment)
 
     # ── Maturity Calculations ──────────────────────────────────────────────────
     def calculate_fd_maturity(self, principal: Decimal, rate: Decimal, tenure_months: int) -> Decimal:
         """FD maturity: compound interest, annual compounding.
         A = P * (1 + r/100) ^ (months/12)
         """
-        maturity = principal * (1 + rate / 100) ** (Decimal(str(tenure_months)) / 12)
-        return round(maturity, 2)
+        return _fd_maturity(principal, rate, int(tenure_months))
 
     def calculate_rd_maturity(self, installment: Decimal, rate: Decimal, tenure_months: int) -> Decimal:
         """RD maturity: each installment earns compound interest for remaining months.
         Standard RD formula.
         """
-        monthly_rate = rate / Decimal("1200")
-        n = tenure_months
-        if monthly_rate > 0:
-            maturity = installment * ((1 + monthly_rate) ** n - 1) / monthly_rate * (1 + monthly_rate)
-        else:
-            maturity = installment * n
-        return round(maturity, 2)
+        return _rd_maturity(installment, rate, int(tenure_months))
 
     # ── Open FD ────────────────────────────────────────────────────────────────
     def open_fd(
@@ -1,9 +1,11 @@
 """
 Loan Service — Business logic for loan applications, EMI calculations, and payments.
 """
+import math
 from decimal import Decimal
 from datetime import date
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from core.models.entities import Loan, LoanStatus, LoanType
 from core.repositories.loan_repository import LoanRepository
 from core.repositories.account_repository import AccountRepository
@@ -23,6 +25,43 @@ DEFAULT_INTEREST_RATE = Decimal("8.50")       # > ₹5,00,000 → 8.5% p.a.
 ALLOWED_TENURES = [6, 12, 24, 36]
 
 
+def _slab_rate_for(principal) -> Decimal:
+    for threshold, rate in INTEREST_SLABS:
+        if principal <= threshold:
+            return rate
+    return DEFAULT_INTEREST_RATE
+
+
+@lru_cache(maxsize=64)
+def _slab_rate_for_bucket(bucket: int) -> Decimal:
+    return _slab_rate_for(bucket)
+
+
+def preview_rate(principal: float) -> Decimal:
+    """Slab rate for a UI principal, memoized per 1,000 bucket across reruns.
+    Rounds up, not down: slab limits are inclusive multiples of 1,000, so 50,500 lands in the >50,000 slab.
+    """
+    return _slab_rate_for_bucket(math.ceil(principal / 1000) * 1000)
+
+
+@lru_cache(maxsize=256)
+def estimate_emi(principal: float, annual_rate: float, tenure_months: int) -> float:
+    """Float EMI for UI previews; LoanService.calculate_emi stays authoritative for persisted loans."""
+    monthly_rate = annual_rate / 1200.0
+    if monthly_rate <= 0:
+        return round(principal / tenure_months, 2)
+    growth = (1.0 + monthly_rate) ** tenure_months
+    return round(principal * monthly_rate * growth / (growth - 1.0), 2)
+
+
+@lru_cache(maxsize=256)
+def estimate_emi_totals(principal: float, annual_rate: float, tenure_months: int) -> Tuple[float, float, float]:
+    """(EMI, total payment, total interest) as floats for the EMI calculator."""
+    emi = estimate_emi(principal, annual_rate, tenure_months)
+    total = round(emi * tenure_months, 2)
+    return emi, total, round(total - principal, 2)
+
+
 class LoanService:
     def __init__(self):
         self.loan_repo = LoanRepository()
@@ -35,10 +74,7 @@ class LoanService:
         """Return fixed annual interest rate based on loan amount slab.
         Rate is INDEPENDENT of tenure.
         """
-        for threshold, rate in INTEREST_SLABS:
-            if principal <= threshold:
-                return rate
-        return DEFAULT_INTEREST_RATE
+        return _slab_rate_for(principal)
 
     # ── EMI Calculation ────────────────────────────────────────────────────────
     def calculate_emi(self, principal: Decimal, annual_rate: Decimal, tenure_months: int) -> Decimal:
@@ -3,6 +3,8 @@ Transaction Service
 Business logic for transaction processing operations
 """
 
+import threading
+from contextlib import nullcontext
 from decimal import Decimal
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
@@ -10,7 +12,9 @@ from typing import List, Optional, Dict, Any
 from core.repositories.transaction_repository import TransactionRepository
 from core.repositories.account_repository import AccountRepository
 from core.repositories.notification_repository import NotificationRepository
-from core.models.entities import Transaction, Account
+from core.repositories.user_repository import UserRepository
+from core.services.audit_service import AuditService
+from core.models.entities import Transaction, Account, AccountStatus
 from utils.exceptions import (
     ValidationException, AccountNotFoundException, 
     InsufficientFundsException, InvalidTransactionException
@@ -19,13 +23,24 @@ from utils.validators import BankingValidator
 from utils.helpers import StringUtils, NumberUtils, LoggingUtils
 from db.database import db_manager
 
+# Repositories are stateless wrappers over db_manager, so share one instance of each
+_TXN_REPO = TransactionRepository()
+_ACCT_REPO = AccountRepository()
+_NOTIF_REPO = NotificationRepository()
+_USER_REPO = UserRepository()
+_AUDIT = AuditService()
+
+# Serializes the check-then-insert for caller-supplied references (idempotency keys)
+_REFERENCE_LOCK = threading.Lock()
+
 class TransactionService:
     """Service class for transaction processing operations"""
     
     def __init__(self):
-        self.transaction_repo = TransactionRepository()
-        self.account_repo = AccountRepository()
-        self.notification_repo = NotificationRepository()
+        self.transaction_repo = _TXN_REPO
+        self.account_repo = _ACCT_REPO
+        self.notification_repo = _NOTIF_REPO
+        self.user_repo = _USER_REPO
     
     def deposit(self, account_id: int, amount: Decimal, description: str = None, 
                performed_by: int = None, txn_type: str = "DEPOSIT",
@@ -34,62 +49,67 @@ class TransactionService:
         try:
             # Validate inputs
             BankingValidator.validate_amount(amount, Decimal('1.00'))
+            fmt_amount = StringUtils.format_currency(amount)
             
             # 1. Role-based permission (Only ADMIN can perform cash deposits)
-            from core.repositories.user_repository import UserRepository
-            user_data = UserRepository().find_by_id(performed_by)
+            user_data = self.user_repo.find_by_id(performed_by)
             role = user_data.get('role', '').upper() if user_data else ''
             if role != 'ADMIN':
                 raise InvalidTransactionException("Unauthorized: Only Admin can perform cash deposits")
 
-            # 2. Get account details
-            account = self.account_repo.find_account_by_id(account_id)
-            if not account:
-                raise AccountNotFoundException(f"Account ID {account_id} not found")
-            
-            # 3. Strict Account Status Check
-            def is_active(acc):
-                s = acc.status.value if hasattr(acc.status, 'value') else str(acc.status)
-                return str(s).lower() == 'active'
-
-            if not is_active(account):
-                raise InvalidTransactionException(f"Transaction blocked: Account status is '{account.status}'")
-            
-            # Calculate new balance
-            new_balance = account.balance + amount
+            # A caller-supplied reference is an idempotency key: a repeated
+            # submission returns the recorded transaction instead of posting twice
+            idempotent = reference is not None
             
             # Generate transaction reference (if not provided)
             if not reference:
                 ref_prefix = "DEP" if txn_type == "DEPOSIT" else "CSH"
                 reference = StringUtils.generate_reference_number(ref_prefix)
             
-            # Use database transaction for atomicity
-            with db_manager.get_transaction() as conn:
-                # Update account balance
-                self.account_repo.update_balance(account_id, new_balance)
+            with _REFERENCE_LOCK if idempotent else nullcontext():
+                if idempotent:
+                    existing = self.transaction_repo.find_by_reference(reference)
+                    if existing:
+                        return self._replayed_deposit(existing, account_id, amount, txn_type)
                 
-                # Create transaction record
-                transaction = Transaction(
-                    account_id=account_id,
-                    txn_type=txn_type,
-                    amount=amount,
-                    balance_after_txn=new_balance,
-                    txn_time=datetime.now(),
-                    reference=reference,
-                    narration=description or f"{txn_type.replace('_', ' ').title()} of {StringUtils.format_currency(amount)}",
-                    created_by=performed_by
-                )
+                # 2. Get account details (read under the reference lock so the balance is current)
+                account = self.account_repo.find_account_by_id(account_id)
+                if not account:
+                    raise AccountNotFoundException(f"Account ID {account_id} not found")
                 
-                txn_id = self.transaction_repo.create_transaction(transaction)
+                # 3. Strict Account Status Check
+                if account.status is not AccountStatus.ACTIVE:
+                    raise InvalidTransactionException(f"Transaction blocked: Account status is '{account.status.value}'")
                 
-                # 4. Log to Audit (Admin action)
-                from core.services.audit_service import AuditService
-                AuditService().log(
-                    actor_id=performed_by,
-                    role='admin',
-                    action='CASH_DEPOSIT',
-                    details={'txn_id': txn_id, 'ref': reference, 'amount': str(amount)}
-                )
+                # Calculate new balance
+                new_balance = account.balance + amount
+                
+                # Use database transaction for atomicity
+                with db_manager.get_transaction() as conn:
+                    # Update account balance
+                    self.account_repo.update_balance(account_id, new_balance)
+                    
+                    # Create transaction record
+                    transaction = Transaction(
+                        account_id=account_id,
+                        txn_type=txn_type,
+                        amount=amount,
+                        balance_after_txn=new_balance,
+                        txn_time=datetime.now(),
+                        reference=reference,
+                        narration=description or f"{txn_type.replace('_', ' ').title()} of {fmt_amount}",
+                        created_by=performed_by
+                    )
+                    
+                    txn_id = self.transaction_repo.create_transaction(transaction)
+            
+            # 4. Log to Audit (Admin action) once the transaction has committed
+            _AUDIT.enqueue(
+                actor_id=performed_by,
+                role='admin',
+                action='CASH_DEPOSIT',
+                details={'txn_id': txn_id, 'ref': reference, 'amount': str(amount)}
+            )
             
             # Log transaction (Legacy log)
             LoggingUtils.log_transaction(
@@ -101,7 +121,7 @@ class TransactionService:
             )
             
             # Send notification (async)
-            self._send_transaction_notification(account, "Deposit", amount, reference)
+            self._send_transaction_notification(account, "Deposit", fmt_amount, reference)
             
             return {
                 'txn_id': txn_id,
@@ -125,16 +145,37 @@ class TransactionService:
             )
             raise
     
+    def _replayed_deposit(self, txn: Transaction, account_id: int, amount: Decimal,
+                          txn_type: str) -> Dict[str, Any]:
+        """Result for a deposit whose reference was already recorded"""
+        # Only a true resubmission of the same deposit may be reported as a duplicate
+        if txn.account_id != account_id or txn.amount != amount or txn.txn_type != txn_type:
+            raise InvalidTransactionException(
+                f"Reference {txn.reference} is already used by a different transaction"
+            )
+        
+        return {
+            'txn_id': txn.txn_id,
+            'reference': txn.reference,
+            'account_id': txn.account_id,
+            'txn_type': txn.txn_type,
+            'amount': txn.amount,
+            'old_balance': txn.balance_after_txn - txn.amount,
+            'new_balance': txn.balance_after_txn,
+            'timestamp': txn.txn_time,
+            'status': 'DUPLICATE'
+        }
+    
     def withdraw(self, account_id: int, amount: Decimal, description: str = None,
                  performed_by: int = None, reference: str = None) -> Dict[str, Any]:
         """Process a withdrawal transaction"""
         try:
             # Validate inputs
             BankingValidator.validate_amount(amount, Decimal('1.00'))
+            fmt_amount = StringUtils.format_currency(amount)
             
             # 1. Role-based permission (Only ADMIN can perform cash withdrawals)
-            from core.repositories.user_repository import UserRepository
-            user_data = UserRepository().find_by_id(performed_by)
+            user_data = self.user_repo.find_by_id(performed_by)
             role = user_data.get('role', '').upper() if user_data else ''
             if role != 'ADMIN':
                 raise InvalidTransactionException("Unauthorized: Only Admin can perform cash withdrawals")
@@ -145,19 +186,15 @@ class TransactionService:
                 raise AccountNotFoundException(f"Account {account_id} not found")
             
             # 2. Strict Account Status Check
-            def is_active(acc):
-                s = acc.status.value if hasattr(acc.status, 'value') else str(acc.status)
-                return str(s).lower() == 'active'
-
-            if not is_active(account):
-                raise InvalidTransactionException(f"Transaction blocked: Account status is '{account.status}'")
+            if account.status is not AccountStatus.ACTIVE:
+                raise InvalidTransactionException(f"Transaction blocked: Account status is '{account.status.value}'")
             
             # 3. Check sufficient funds
-            if not self.account_repo.validate_sufficient_funds(account_id, amount):
+            if not self.account_repo.validate_sufficient_funds_on(account, amount):
                 available = account.balance + account.od_limit
                 raise InsufficientFundsException(
                     f"Insufficient funds. Available: {StringUtils.format_currency(available)}, "
-                    f"Requested: {StringUtils.format_currency(amount)}"
+                    f"Requested: {fmt_amount}"
                 )
             
             # Calculate new balance
@@ -180,20 +217,19 @@ class TransactionService:
                     balance_after_txn=new_balance,
                     txn_time=datetime.now(),
                     reference=reference,
-                    narration=description or f"Cash withdrawal of {StringUtils.format_currency(amount)}",
+                    narration=description or f"Cash withdrawal of {fmt_amount}",
                     created_by=performed_by
                 )
                 
                 txn_id = self.transaction_repo.create_transaction(transaction)
-                
-                # 4. Log to Audit (Admin action — only admins can withdraw)
-                from core.services.audit_service import AuditService
-                AuditService().log(
-                    actor_id=performed_by,
-                    role='admin',
-                    action='CASH_WITHDRAWAL',
-                    details={'txn_id': txn_id, 'ref': reference, 'amount': str(amount)}
-                )
+            
+            # 4. Log to Audit (Admin action — only admins can withdraw)
+            _AUDIT.enqueue(
+                actor_id=performed_by,
+                role='admin',
+                action='CASH_WITHDRAWAL',
+                details={'txn_id': txn_id, 'ref': reference, 'amount': str(amount)}
+            )
             
             # Log transaction
             LoggingUtils.log_transaction(
@@ -205,7 +241,7 @@ class TransactionService:
             )
             
             # Send notification
-            self._send_transaction_notification(account, "Withdrawal", amount, reference)
+            self._send_transaction_notification(account, "Withdrawal", fmt_amount, reference)
             
             # Check for low balance alert
             if new_balance < account.min_balance:
@@ -241,6 +277,7 @@ class TransactionService:
         try:
             # Validate inputs
             BankingValidator.validate_amount(amount, Decimal('1.00'))
+            fmt_amount = StringUtils.format_currency(amount)
             
             if from_account_id == to_account_id:
                 raise ValidationException("Cannot transfer to the same account")
@@ -254,8 +291,7 @@ class TransactionService:
                 raise AccountNotFoundException(f"Destination account ID {to_account_id} not found")
             
             # 1. Ownership check for customers
-            from core.repositories.user_repository import UserRepository
-            user_data = UserRepository().find_by_id(performed_by)
+            user_data = self.user_repo.find_by_id(performed_by)
             role = user_data.get('role', '').upper() if user_data else ''
             
             if role != 'ADMIN':
@@ -263,17 +299,13 @@ class TransactionService:
                     raise InvalidTransactionException("Unauthorized: You can only transfer funds from your own account")
 
             # 2. Strict Status Checks
-            def is_active(acc):
-                s = acc.status.value if hasattr(acc.status, 'value') else str(acc.status)
-                return str(s).lower() == 'active'
-            
-            if not is_active(from_account):
-                raise InvalidTransactionException(f"Transfer blocked: Source account is {from_account.status}")
-            if not is_active(to_account):
-                raise InvalidTransactionException(f"Transfer blocked: Destination account is {to_account.status}")
+            if from_account.status is not AccountStatus.ACTIVE:
+                raise InvalidTransactionException(f"Transfer blocked: Source account is {from_account.status.value}")
+            if to_account.status is not AccountStatus.ACTIVE:
+                raise InvalidTransactionException(f"Transfer blocked: Destination account is {to_account.status.value}")
             
             # Check sufficient funds in source account
-            if not self.account_repo.validate_sufficient_funds(from_account_id, amount):
+            if not self.account_repo.validate_sufficient_funds_on(from_account, amount):
                 available = from_account.balance + from_account.od_limit
                 raise InsufficientFundsException(
                     f"Insufficient funds in source account. Available: {StringUtils.format_currency(available)}"
@@ -289,9 +321,11 @@ class TransactionService:
             
             # Use database transaction for atomicity
             with db_manager.get_transaction() as conn:
-                # Update both account balances
-                self.account_repo.update_balance(from_account_id, from_new_balance)
-                self.account_repo.update_balance(to_account_id, to_new_balance)
+                # Update both account balances in one statement
+                self.account_repo.update_balances_bulk({
+                    from_account_id: from_new_balance,
+                    to_account_id: to_new_balance
+                })
                 
                 # Create debit transaction for source account
                 debit_transaction = Transaction(
@@ -319,17 +353,17 @@ class TransactionService:
                     created_by=performed_by
                 )
                 
+                # Separate inserts so each ledger row gets its own lastrowid
                 debit_txn_id = self.transaction_repo.create_transaction(debit_transaction)
                 credit_txn_id = self.transaction_repo.create_transaction(credit_transaction)
-
-                # Log to Audit
-                from core.services.audit_service import AuditService
-                AuditService().log(
-                    actor_id=performed_by,
-                    role='customer',
-                    action='TRANSFER',
-                    details={'ref': reference, 'from': from_account_id, 'to': to_account_id, 'amount': str(amount)}
-                )
+            
+            # Log to Audit
+            _AUDIT.enqueue(
+                actor_id=performed_by,
+                role='customer',
+                action='TRANSFER',
+                details={'ref': reference, 'from': from_account_id, 'to': to_account_id, 'amount': str(amount)}
+            )
             
             # Log transaction (Legacy)
             LoggingUtils.log_transaction(
@@ -346,8 +380,8 @@ class TransactionService:
             )
             
             # Send notifications to both accounts
-            self._send_transaction_notification(from_account, "Transfer Debit", amount, reference)
-            self._send_transaction_notification(to_account, "Transfer Credit", amount, reference)
+            self._send_transaction_notification(from_account, "Transfer Debit", fmt_amount, reference)
+            self._send_transaction_notification(to_account, "Transfer Credit", fmt_amount, reference)
             
             return {
                 'debit_txn_id': debit_txn_id,
@@ -383,13 +417,12 @@ class TransactionService:
                                limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """Get transaction history for an account with RBAC"""
         # 1. Get account details for ownership check
-        account = self.account_repo.find_account_by_id(account_id)
+        account = self.account_repo.find_account_by_id_cached(account_id)
         if not account:
             raise AccountNotFoundException(f"Account {account_id} not found")
 
         # 2. Role-based check
-        from core.repositories.user_repository import UserRepository
-        user_data = UserRepository().find_by_id(performed_by)
+        user_data = self.user_repo.find_by_id(performed_by)
         role = user_data.get('role', '').upper() if user_data else ''
         
         if role != 'ADMIN' and account.user_id != performed_by:
@@ -397,9 +430,8 @@ class TransactionService:
 
         transactions = self.transaction_repo.find_by_account(account_id, limit, offset)
         
-        history = []
-        for txn in transactions:
-            history.append({
+        return [
+            {
                 'txn_id': txn.txn_id,
                 'reference': txn.reference,
                 'txn_type': txn.txn_type,
@@ -408,9 +440,9 @@ class TransactionService:
                 'narration': txn.narration,
                 'txn_time': txn.txn_time,
                 'related_account': txn.related_account_id
-            })
-        
-        return history
+            }
+            for txn in transactions
+        ]
     
     def get_transaction_by_reference(self, reference: str) -> Optional[Dict[str, Any]]:
         """Get transaction details by reference number"""
@@ -434,13 +466,12 @@ class TransactionService:
     def get_transaction_summary(self, account_id: int, days: int = 30, performed_by: int = None) -> Dict[str, Any]:
         """Get transaction summary for an account with RBAC"""
         # 1. Get account details for ownership check
-        account = self.account_repo.find_account_by_id(account_id)
+        account = self.account_repo.find_account_by_id_cached(account_id)
         if not account:
             raise AccountNotFoundException(f"Account {account_id} not found")
 
         # 2. Role-based check
-        from core.repositories.user_repository import UserRepository
-        user_data = UserRepository().find_by_id(performed_by)
+        user_data = self.user_repo.find_by_id(performed_by)
         role = user_data.get('role', '').upper() if user_data else ''
         
         if role != 'ADMIN' and account.user_id != performed_by:
@@ -458,15 +489,28 @@ class TransactionService:
             'average_transaction': summary['avg_amount']
         }
     
+    def get_txn_type_summary(self, account_id: int, days: int = 30, performed_by: int = None) -> Dict[str, Decimal]:
+        """Get total amount per transaction type for an account with RBAC"""
+        account = self.account_repo.find_account_by_id_cached(account_id)
+        if not account:
+            raise AccountNotFoundException(f"Account {account_id} not found")
+
+        user_data = self.user_repo.find_by_id(performed_by)
+        role = user_data.get('role', '').upper() if user_data else ''
+
+        if role != 'ADMIN' and account.user_id != performed_by:
+            raise InvalidTransactionException("Unauthorized: You can only view summaries for your own account")
+
+        return self.transaction_repo.get_amount_by_type(account_id, days)
+    
     def search_transactions(self, criteria: Dict[str, Any], performed_by: int = None) -> List[Dict[str, Any]]:
         """Search transactions by criteria with RBAC"""
         # RBAC Check if account_id is provided in search criteria
         target_account_id = criteria.get('account_id')
         if target_account_id:
-            account = self.account_repo.find_account_by_id(target_account_id)
+            account = self.account_repo.find_account_by_id_cached(target_account_id)
             if account:
-                from core.repositories.user_repository import UserRepository
-                user_data = UserRepository().find_by_id(performed_by)
+                user_data = self.user_repo.find_by_id(performed_by)
                 role = user_data.get('role', '').upper() if user_data else ''
                 
                 if role != 'ADMIN' and account.user_id != performed_by:
@@ -474,9 +518,8 @@ class TransactionService:
 
         transactions = self.transaction_repo.search_transactions(criteria)
         
-        results = []
-        for txn in transactions:
-            results.append({
+        return [
+            {
                 'txn_id': txn.txn_id,
                 'reference': txn.reference,
                 'account_id': txn.account_id,
@@ -486,18 +529,18 @@ class TransactionService:
                 'description': txn.narration,
                 'timestamp': txn.txn_time,
                 'related_account': txn.related_account_id
-            })
-        
-        return results
+            }
+            for txn in transactions
+        ]
     
     def _send_transaction_notification(self, account: Account, txn_type: str, 
-                                     amount: Decimal, reference: str):
+                                     formatted_amount: str, reference: str):
         """Send transaction notification to customer"""
         try:
             self.notification_repo.create_transaction_notification(
                 user_id=account.user_id,
                 transaction_type=txn_type,
-                amount=StringUtils.format_currency(amount),
+                amount=formatted_amount,
                 account_number=StringUtils.mask_account_number(account.account_number)
             )
         except Exception as e:
@@ -5,10 +5,10 @@ Handles MySQL connection pooling and configuration for SecureCore Banking System
 
 import mysql.connector
 from mysql.connector import pooling, Error
+from mysql.connector.constants import ClientFlag
 import os
 from typing import Optional
 import logging
-from contextlib import contextmanager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,7 +30,10 @@ class DatabaseConfig:
             'autocommit': False,
             'pool_name': 'securecore_pool',
             'pool_size': 10,
-            'pool_reset_session': True
+            'pool_reset_session': True,
+            'allow_local_infile': False,
+            'use_unicode': True,
+            'client_flags': [ClientFlag.FOUND_ROWS]
         }
         
         self.connection_pool = None
@@ -66,45 +69,58 @@ class DatabaseConfig:
             logger.error(f"Database connection test failed: {e}")
             return False
 
+class _ConnectionContext:
+    """Pooled connection scope; commits on success when transactional, rolls back on error"""
+    
+    __slots__ = ('_config', '_transactional', '_connection')
+    
+    def __init__(self, config: DatabaseConfig, transactional: bool):
+        self._config = config
+        self._transactional = transactional
+        self._connection = None
+    
+    def __enter__(self):
+        connection = self._config.get_connection()
+        if self._transactional:
+            try:
+                connection.start_transaction()
+            except BaseException:
+                # __exit__ won't run when __enter__ raises, so hand the connection back here
+                connection.close()
+                raise
+        self._connection = connection
+        return connection
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        connection = self._connection
+        try:
+            if exc_type is not None:
+                is_db_error = issubclass(exc_type, Error)
+                if is_db_error or self._transactional:
+                    connection.rollback()
+                if is_db_error:
+                    label = "Transaction error" if self._transactional else "Database error"
+                    logger.error(f"{label}: {exc_value}")
+            elif self._transactional:
+                connection.commit()
+        finally:
+            if connection.is_connected():
+                connection.close()
+        return False
+
 class DatabaseManager:
     """Database operations manager"""
     
     def __init__(self):
         self.db_config = DatabaseConfig()
     
-    @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
-        connection = None
-        try:
-            connection = self.db_config.get_connection()
-            yield connection
-        except Error as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"Database error: {e}")
-            raise
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
+        return _ConnectionContext(self.db_config, transactional=False)
     
-    @contextmanager
     def get_transaction(self):
         """Context manager for database transactions"""
-        connection = None
-        try:
-            connection = self.db_config.get_connection()
-            connection.start_transaction()
-            yield connection
-            connection.commit()
-        except Error as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"Transaction error: {e}")
-            raise
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
+        return _ConnectionContext(self.db_config, transactional=True)
     
     def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
         """Execute a query and return results"""
@@ -123,13 +139,23 @@ class DatabaseManager:
             finally:
                 cursor.close()
     
+    # Rows per executemany() call; keeps each rewritten multi-row INSERT well under max_allowed_packet
+    EXECUTE_MANY_BATCH_SIZE = 500
+    
     def execute_many(self, query: str, params_list: list):
-        """Execute query with multiple parameter sets"""
+        """Execute query with multiple parameter sets in one transaction.
+        
+        Pass plain ``INSERT INTO ... VALUES (%s, ...)`` statements so the connector
+        rewrites each batch into a single multi-row INSERT.
+        """
         with self.get_transaction() as connection:
             cursor = connection.cursor()
             try:
-                cursor.executemany(query, params_list)
-                return cursor.rowcount
+                total = 0
+                for start in range(0, len(params_list), self.EXECUTE_MANY_BATCH_SIZE):
+                    cursor.executemany(query, params_list[start:start + self.EXECUTE_MANY_BATCH_SIZE])
+                    total += cursor.rowcount
+                return total
             finally:
                 cursor.close()
 
@@ -7,12 +7,14 @@ import streamlit as st
 from datetime import date, timedelta
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.services.authentication_service import AuthenticationService
-from utils.exceptions import ValidationException, InvalidOTPException
-from utils.auth_guard import is_logged_in
+from utils.exceptions import ValidationException, InvalidOTPException, RateLimitException
+from utils.auth_guard import is_logged_in, get_client_ip
+from utils.services import get_auth_service
+from utils.formatters import mask_phone
 
 
 
@@ -26,13 +28,36 @@ for key, default in {
     "reg_user_id": None,
     "reg_phone": None,
     "reg_otp_dev": None,     # dev-mode OTP display
-    "reg_otp_attempts": 0,
+    "reg_otp_last_sent_ts": 0.0,
 }.items():
     if key not in st.session_state:
         st.session_state[key] = default
 
 
-auth_service = AuthenticationService()
+auth_service = get_auth_service()
+
+
+@st.fragment(run_every=1)
+def _resend_otp_fragment():
+    """Resend button with a live cooldown countdown; re-enables itself when the cooldown ends."""
+    cooldown_left = int(auth_service.OTP_RESEND_COOLDOWN_SECONDS - (time.time() - st.session_state.reg_otp_last_sent_ts))
+    cooldown_active = cooldown_left > 0
+    if cooldown_active:
+        st.caption(f"You can request a new OTP in {cooldown_left}s.")
+    if st.button("Resend OTP", disabled=cooldown_active):
+        try:
+            new_otp = auth_service.generate_otp(
+                st.session_state.reg_user_id, "registration", client_ip=get_client_ip()
+            )
+            st.session_state.reg_otp_dev = new_otp
+            st.session_state.reg_otp_last_sent_ts = time.time()
+            st.success("New OTP sent!")
+            # Full rerun so the dev-mode OTP banner above shows the new code
+            st.rerun(scope="app")
+        except RateLimitException as e:
+            st.error(f"Please wait {e.retry_after}s before requesting another OTP.")
+        except Exception as e:
+            st.error(str(e))
 
 
 # Header
@@ -109,12 +134,11 @@ if st.session_state.reg_step == 1:
                 st.session_state.reg_user_id = result['user_id']
                 st.session_state.reg_phone = result['phone']
                 st.session_state.reg_otp_dev = result.get('otp_code')
-                st.session_state.reg_otp_attempts = 0
+                st.session_state.reg_otp_last_sent_ts = time.time()
                 st.session_state.reg_step = 2
                 st.rerun()
 
             except (ValidationException, Exception) as e:
-                import traceback
                 error_detail = f"\n\nDetails: {str(e)}" if str(e) else ""
                 st.error(f"Registration failed.{error_detail}")
                 if os.getenv("DEBUG") == "True":
@@ -126,9 +150,7 @@ if st.session_state.reg_step == 1:
 # STEP 2 - OTP Verification
 elif st.session_state.reg_step == 2:
 
-    masked = st.session_state.reg_phone
-    if masked and len(masked) >= 4:
-        masked = masked[:2] + "XXXX" + masked[-4:]
+    masked = mask_phone(st.session_state.reg_phone)
     st.info(f"OTP sent to **{masked}**. Valid for 5 minutes.")
 
     # Dev mode: show OTP on screen
@@ -148,34 +170,23 @@ elif st.session_state.reg_step == 2:
             try:
                 result = auth_service.verify_registration_otp(
                     user_id=st.session_state.reg_user_id,
-                    otp_code=otp_input
+                    otp_code=otp_input,
+                    client_ip=get_client_ip()
                 )
                 st.session_state.reg_step = 3
                 st.rerun()
 
-            except InvalidOTPException:
-                st.session_state.reg_otp_attempts += 1
-                if st.session_state.reg_otp_attempts >= 3:
-                    st.error("Too many wrong attempts. Please request a new OTP.")
-                else:
-                    remaining = 3 - st.session_state.reg_otp_attempts
-                    st.error(f"Invalid or expired OTP. {remaining} attempt(s) left.")
+            except InvalidOTPException as e:
+                # Attempt counting and lockout are enforced server-side
+                st.error(e.message)
+            except RateLimitException as e:
+                st.error(f"Too many attempts, retry in {e.retry_after}s.")
             except Exception as e:
                 st.error(str(e))
 
-    # Resend OTP
+    # Resend OTP (cooldown is enforced server-side; the disabled button is a UI hint)
     st.markdown("")
-    if st.button("Resend OTP"):
-        try:
-            new_otp = auth_service.generate_otp(
-                st.session_state.reg_user_id, "registration"
-            )
-            st.session_state.reg_otp_dev = new_otp
-            st.session_state.reg_otp_attempts = 0
-            st.success("New OTP sent!")
-            st.rerun()
-        except Exception as e:
-            st.error(str(e))
+    _resend_otp_fragment()
 
 
 # STEP 3 - Registration Complete
@@ -199,7 +210,7 @@ elif st.session_state.reg_step == 3:
 
     if st.button("<- Back to Login", use_container_width=True):
         # Reset registration state
-        for key in ["reg_step", "reg_user_id", "reg_phone", "reg_otp_dev", "reg_otp_attempts"]:
+        for key in ["reg_step", "reg_user_id", "reg_phone", "reg_otp_dev", "reg_otp_last_sent_ts"]:
             if key in st.session_state:
                 del st.session_state[key]
         st.rerun()
@@ -3,14 +3,23 @@ Dashboard Page - Unified interface with role-based conditional rendering.
 Shows customer features for CUSTOMER role, admin features for ADMIN role.
 """
 
+import json
+
+import pandas as pd
 import streamlit as st
 from decimal import Decimal
 
-
-
-from utils.auth_guard import require_login, get_current_user, is_admin, is_customer, get_user_role
+from core.models.entities import UserRole
+from db.database import db_manager
+from utils.auth_guard import require_login, get_current_user, get_user_role, handle_logout
+from utils.helpers import StringUtils
 from utils.sidebar import render_sidebar
 from utils.formatters import format_currency, format_date
+from utils.services import (
+    get_auth_service, get_account_service, get_txn_service,
+    get_cust_repo, load_pending_users, load_low_balance_accounts,
+    load_user_page, load_customer_info, load_audit_logs
+)
 
 require_login()
 render_sidebar()
@@ -24,31 +33,335 @@ st.caption(f"Welcome, **{sd.get('username', 'User')}** ({role.replace('_', ' ').
 st.markdown("---")
 
 # ===============================================================
-# CUSTOMER DASHBOARD
+# ADMIN FRAGMENTS (each reruns on its own widgets only)
 # ===============================================================
-if is_customer():
+def _record_cash_deposit(admin_id: int):
+    """Submit callback: post the deposit once, before the form re-renders."""
+    ref = st.session_state["admin_deposit_ref"]
+    try:
+        # Find account ID by account number
+        acct_repo = get_account_service().account_repo
+        target_acct = acct_repo.find_by_account_number(st.session_state["admin_dep_acc"])
+
+        if not target_acct:
+            st.session_state["admin_deposit_result"] = ("error", "Account not found. Please verify account number.")
+            return
+        res = get_txn_service().deposit(
+            account_id=target_acct.account_id,
+            amount=Decimal(str(st.session_state["admin_dep_amt"])),
+            description=st.session_state["admin_dep_nar"],
+            performed_by=admin_id,
+            txn_type="CASH_DEPOSIT",
+            reference=ref
+        )
+    except Exception as e:
+        st.session_state["admin_deposit_result"] = ("error", f"{e}")
+        return
+
+    # The reference has been consumed either way; the next form load gets a fresh one
+    st.session_state.pop("admin_deposit_ref")
+    if res['status'] == 'DUPLICATE':
+        st.session_state["admin_deposit_result"] = ("info", f"Deposit already recorded. Ref: {res['reference']}")
+    else:
+        st.session_state["admin_deposit_result"] = ("success", f"Cash deposit recorded! Ref: {res['reference']}")
+
+
+@st.fragment
+def _deposit_fragment(admin_id: int):
+    """Branch cash deposit form."""
+    # Idempotency: Generate reference for this form load
+    if "admin_deposit_ref" not in st.session_state:
+        st.session_state["admin_deposit_ref"] = StringUtils.generate_reference_number("CSH")
+
+    with st.form("admin_deposit_form", clear_on_submit=True):
+        st.text_input("Account Number", placeholder="e.g. SC-SAV-0001-1234", key="admin_dep_acc")
+        st.number_input("Deposit Amount", min_value=1.0, step=500.0, key="admin_dep_amt")
+        st.text_input("Narration", value="Cash deposit at branch", key="admin_dep_nar")
+        st.caption(f"Transaction ID: `{st.session_state['admin_deposit_ref']}`")
+        st.form_submit_button("Record Cash Deposit", use_container_width=True,
+                              on_click=_record_cash_deposit, args=(admin_id,))
+
+    result = st.session_state.pop("admin_deposit_result", None)
+    if result:
+        kind, msg = result
+        getattr(st, kind)(msg)
+        if kind == "success":
+            st.balloons()
+
+
+def _admin_action(action, *args, toast: str = None):
+    """Button callback: run an admin action before the rerun it triggers."""
     try:
-        from core.services.account_service import AccountService
-        from core.services.transaction_service import TransactionService
+        action(*args)
+    except Exception as e:
+        st.session_state["admin_action_error"] = f"{e}"
+        return
+    load_pending_users.clear()
+    load_user_page.clear()
+    load_customer_info.clear()
+    if toast:
+        st.toast(toast)
 
-        acct_svc = AccountService()
-        txn_svc = TransactionService()
 
-        from core.repositories.customer_repository import CustomerRepository
-        cust_repo = CustomerRepository()
-        customer = cust_repo.find_customer_by_id(sd["user_id"])
+def _refresh_overview():
+    """Invalidate the admin read models so the next render refetches them."""
+    for loader in (load_low_balance_accounts, load_pending_users, load_audit_logs):
+        loader.clear()
+    _db_status.clear()
 
-        accounts = []
-        if customer:
-            user_id = customer.user_id
-            accounts = acct_svc.get_customer_accounts(user_id)
 
+def _show_admin_action_error():
+    """Surface an error recorded by _admin_action on the previous click."""
+    err = st.session_state.pop("admin_action_error", None)
+    if err:
+        st.error(f"Error: {err}")
+
+
+@st.fragment
+def _pending_fragment(admin_id: int):
+    """Pending KYC approvals with approve/reject actions."""
+    _show_admin_action_error()
+    try:
+        auth = get_auth_service()
+        pending_users = load_pending_users()
+
+        if not pending_users:
+            st.info("No pending approvals.")
+        else:
+            st.metric("Pending Approvals", len(pending_users))
+            customers = get_cust_repo().find_by_ids([u.user_id for u in pending_users])
+            for user in pending_users:
+                customer = customers.get(user.user_id)
+                cust_name = customer.full_name if customer else "N/A"
+                with st.expander(f"Review: {cust_name} (@{user.username})"):
+                    st.markdown(f"**Phone:** {user.phone} | **DOB:** {customer.dob if customer else 'N/A'}")
+                    b1, b2 = st.columns(2)
+                    b1.button("Approve", key=f"apprv_{user.user_id}", use_container_width=True,
+                              on_click=_admin_action, args=(auth.approve_user, user.user_id, admin_id))
+                    b2.button("Reject", key=f"rej_{user.user_id}", use_container_width=True,
+                              on_click=_admin_action, args=(auth.reject_kyc, user.user_id, admin_id, "Rejected by admin"))
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+
+@st.fragment
+def _create_user_fragment(admin_id: int):
+    """Quick create user form."""
+    with st.expander("New User Form", expanded=False):
+        with st.form("create_user_form"):
+            cu_col1, cu_col2 = st.columns(2)
+            with cu_col1:
+                new_username = st.text_input("Username")
+                new_password = st.text_input("Password", type="password")
+            with cu_col2:
+                new_role = st.selectbox("Role", ["customer", "admin"])
+                confirm_password = st.text_input("Confirm Password", type="password")
+
+            create_submitted = st.form_submit_button("Create User", use_container_width=True)
+
+        if create_submitted:
+            if new_password != confirm_password:
+                st.error("Passwords do not match.")
+            else:
+                try:
+                    get_auth_service().create_user(new_username, new_password, UserRole(new_role), admin_id)
+                    st.success(f"User {new_username} created!")
+                    load_user_page.clear()
+                    st.rerun(scope="fragment")
+                except Exception as e:
+                    st.error(f"{e}")
+
+
+USER_PAGE_SIZE = 25
+
+
+@st.fragment
+def _user_list_fragment(admin_id: int):
+    """All system users with block/unblock/force-logout actions."""
+    if st.button("Load User List", use_container_width=True):
+        st.session_state["admin_user_list_open"] = True
+
+    _show_admin_action_error()
+    if st.session_state.get("admin_user_list_open"):
+        try:
+            _, total = load_user_page(1, USER_PAGE_SIZE)
+            pages = max(1, -(-total // USER_PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="admin_user_page")
+            users, total = load_user_page(int(page), USER_PAGE_SIZE)
+        except Exception as e:
+            st.error(f"{e}")
+            return
+        st.caption(f"{total} users - page {int(page)} of {pages}")
+        auth = get_auth_service()
+        for user in users:
+            status = user.registration_status
+            role_label = user.role.value if hasattr(user.role, 'value') else str(user.role)
+            with st.expander(f"{user.username} - {role_label.title()} ({status})"):
+                bc1, bc2 = st.columns(2)
+                if status == "blocked":
+                    bc1.button(f"Unblock {user.username}", key=f"unbl_{user.user_id}", use_container_width=True,
+                               on_click=_admin_action, args=(auth.unblock_user, user.user_id, admin_id))
+                else:
+                    bc1.button(f"Block {user.username}", key=f"bl_{user.user_id}", use_container_width=True,
+                               on_click=_admin_action, args=(auth.block_user, user.user_id, admin_id, "Admin action"))
+                
+                bc2.button(f"Force Logout {user.username}", key=f"flog_{user.user_id}", use_container_width=True,
+                           on_click=_admin_action, args=(auth.force_logout, user.user_id, admin_id),
+                           kwargs={"toast": f"Sessions invalidated for {user.username}"})
+
+
+@st.fragment
+def _freeze_fragment(admin_id: int):
+    """Freeze account form."""
+    st.markdown("#### Freeze Account")
+    with st.form("freeze_form"):
+        acc_to_freeze = st.text_input("Account Number", placeholder="SC-SAV-...")
+        freeze_reason = st.text_input("Reason", placeholder="Suspicious activity")
+        if st.form_submit_button("Freeze Account", use_container_width=True):
+            try:
+                asvc = get_account_service()
+                acct = asvc.account_repo.find_by_account_number(acc_to_freeze)
+                if not acct: st.error("Account not found")
+                else:
+                    asvc.freeze_account(acct.account_id, freeze_reason, admin_id)
+                    st.success(f"Account {acc_to_freeze} frozen.")
+            except Exception as e: st.error(f"{e}")
+
+
+@st.fragment
+def _unfreeze_fragment(admin_id: int):
+    """Unfreeze account form."""
+    st.markdown("#### Unfreeze Account")
+    with st.form("unfreeze_form"):
+        acc_to_unfreeze = st.text_input("Account Number", placeholder="SC-SAV-...")
+        unfreeze_reason = st.text_input("Reason", placeholder="Issue resolved")
+        if st.form_submit_button("Unfreeze Account", use_container_width=True):
+            try:
+                asvc = get_account_service()
+                acct = asvc.account_repo.find_by_account_number(acc_to_unfreeze)
+                if not acct: st.error("Account not found")
+                else:
+                    asvc.unfreeze_account(acct.account_id, unfreeze_reason, admin_id)
+                    st.success(f"Account {acc_to_unfreeze} unfrozen.")
+            except Exception as e: st.error(f"{e}")
+
+
+def _parse_details(details):
+    """Decode JSON detail payloads, leaving anything else untouched."""
+    if isinstance(details, str) and details.startswith('{'):
+        try:
+            return json.loads(details)
+        except ValueError:
+            pass
+    return details
+
+
+@st.cache_data(ttl=20, show_spinner=False)
+def _audit_log_table(latest_ts, row_count: int, _logs: list) -> pd.DataFrame:
+    """Display-ready audit DataFrame, rebuilt only when new entries arrive."""
+    df = pd.DataFrame(_logs)
+    return pd.DataFrame({
+        # Raw values through format_date, exactly as before (pandas would turn None into NaT)
+        "Time": [format_date(log['created_at']) for log in _logs],
+        "Actor ID": df['actor_id'],
+        "Role": df['role'].str.upper(),
+        "Action": df['action'],
+        "Details": df['details'].map(_parse_details).astype(str),
+    })
+
+
+@st.fragment
+def _audit_fragment():
+    """Audit trail with manual refresh."""
+    if st.button("Refresh Audit Logs", use_container_width=True):
+        try:
+            load_audit_logs.clear()
+            st.session_state["admin_audit_logs"] = load_audit_logs(50)
+        except Exception as e:
+            st.error(f"{e}")
+
+    if "admin_audit_logs" in st.session_state:
+        logs = st.session_state["admin_audit_logs"]
+        if logs:
+            latest = max(l['created_at'] for l in logs)
+            st.dataframe(_audit_log_table(latest, len(logs), logs), use_container_width=True, hide_index=True)
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _db_status() -> str:
+    """Database connectivity probe, run at most once per TTL window."""
+    try:
+        return "Connected" if db_manager.db_config.test_connection() else "Disconnected"
+    except Exception:
+        return "Error"
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _active_sessions() -> list:
+    """Active session list; short TTL absorbs repeated clicks."""
+    return get_auth_service().get_active_sessions()
+
+
+@st.fragment
+def _sessions_fragment():
+    """Session cleanup and active-session listing."""
+    c_cl, c_act = st.columns(2)
+    with c_cl:
+        if st.button("Cleanup Expired Sessions", use_container_width=True):
+            try:
+                count = get_auth_service().cleanup_expired_sessions()
+                _active_sessions.clear()
+                st.success(f"Cleaned {count} sessions.")
+            except Exception as e: st.error(f"{e}")
+    
+    with c_act:
+        if st.button("View Active Sessions", use_container_width=True):
+            try:
+                st.session_state["admin_active_sessions"] = _active_sessions()
+            except Exception as e: st.error(f"{e}")
+
+    if "admin_active_sessions" in st.session_state:
+        for s in st.session_state["admin_active_sessions"]:
+            st.write(f"- **{s['username']}** (ID: {s['user_id']}) from {s.get('ip_address', 'Unknown')} at {format_date(s['login_time'])}")
+
+
+def _recent_txn_table(history: list) -> pd.DataFrame:
+    """Recent transactions as a display-ready DataFrame."""
+    if not history:
+        return pd.DataFrame()
+    df = pd.DataFrame(history)[['txn_time', 'txn_type', 'amount', 'balance_after_txn']]
+    df['amount'] = df['amount'].map(format_currency)
+    df['balance_after_txn'] = df['balance_after_txn'].map(format_currency)
+    df['txn_time'] = pd.to_datetime(df['txn_time']).dt.strftime('%Y-%m-%d %H:%M')
+    df.columns = ['Date', 'Type', 'Amount', 'Balance After']
+    return df
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _dashboard_bundle(user_id: int) -> dict:
+    """Customer, active accounts and formatted recent transactions in one fetch."""
+    bundle = get_account_service().get_dashboard_bundle(user_id, history_limit=5)
+    bundle['recent_txns'] = _recent_txn_table(bundle['recent_txns'])
+    return bundle
+
+
+# ===============================================================
+# CUSTOMER DASHBOARD
+# ===============================================================
+if role == "customer":
+    try:
+        bundle = _dashboard_bundle(sd["user_id"])
+        customer = bundle['customer']
+        accounts = bundle['accounts'] if customer else []
+
+        if customer:
             # Self-healing: If user is active but missing account row, create it now
             if not accounts and sd.get("registration_status") == "active":
                 with st.spinner("Initializing your initial savings account..."):
-                    init_res = acct_svc.initiate_savings_account(sd["user_id"])
+                    init_res = get_account_service().initiate_savings_account(sd["user_id"])
                     if init_res.get("success"):
-                        accounts = acct_svc.get_customer_accounts(sd["user_id"])
+                        _dashboard_bundle.clear()
+                        accounts = [init_res['account']]
                         st.toast("Savings account auto-initialized.")
 
         if not accounts:
@@ -83,22 +396,11 @@ if is_customer():
 
             with op_col2:
                 st.subheader("Recent Transactions")
-                history = txn_svc.get_transaction_history(
-                    main_acct['account_id'],
-                    performed_by=sd["user_id"],
-                    limit=5
-                )
-                if not history:
+                recent_df = bundle['recent_txns']
+                if recent_df.empty:
                     st.info("No transactions logged for this account.")
                 else:
-                    import pandas as pd
-                    df = pd.DataFrame(history)
-                    df = df[['txn_time', 'txn_type', 'amount', 'balance_after_txn']]
-                    df['amount'] = df['amount'].apply(lambda x: format_currency(x))
-                    df['balance_after_txn'] = df['balance_after_txn'].apply(lambda x: format_currency(x))
-                    df['txn_time'] = pd.to_datetime(df['txn_time']).dt.strftime('%Y-%m-%d %H:%M')
-                    df.columns = ['Date', 'Type', 'Amount', 'Balance After']
-                    st.table(df)
+                    st.dataframe(recent_df, use_container_width=True, hide_index=True)
 
     except Exception as e:
         st.error(f"Error loading banking data: {e}")
@@ -106,7 +408,7 @@ if is_customer():
 # ===============================================================
 # ADMIN DASHBOARD
 # ===============================================================
-elif is_admin():
+elif role == "admin":
     # Admin sees everything in tabs
     tab_overview, tab_users, tab_accounts, tab_audit, tab_system = st.tabs([
         "Overview",
@@ -125,9 +427,7 @@ elif is_admin():
         c1, c2, c3, c4 = st.columns(4)
 
         try:
-            from core.services.account_service import AccountService
-            acct_svc = AccountService()
-            low_bal = acct_svc.get_low_balance_accounts()
+            low_bal = load_low_balance_accounts()
             low_count = len(low_bal) if low_bal else 0
         except Exception:
             low_count = 0
@@ -144,51 +444,13 @@ elif is_admin():
         with qa1:
             st.page_link("pages/7_Reports.py", label="Detailed Reports", use_container_width=True)
         with qa2:
-             if st.button("Refresh Overview", use_container_width=True):
-                 st.rerun()
+             # The click already reruns the script; the callback only drops cached reads
+             st.button("Refresh Overview", use_container_width=True, on_click=_refresh_overview)
 
         st.markdown("---")
         st.subheader("Branch Cash Deposit")
         st.caption("Record a cash deposit for a customer at the branch.")
-
-        # Idempotency: Generate reference for this form load
-        if "admin_deposit_ref" not in st.session_state:
-            from utils.helpers import StringUtils
-            st.session_state["admin_deposit_ref"] = StringUtils.generate_reference_number("CSH")
-
-        with st.form("admin_deposit_form", clear_on_submit=True):
-            d_acc = st.text_input("Account Number", placeholder="e.g. SC-SAV-0001-1234")
-            d_amt = st.number_input("Deposit Amount", min_value=1.0, step=500.0)
-            d_nar = st.text_input("Narration", value="Cash deposit at branch")
-            st.caption(f"Transaction ID: `{st.session_state['admin_deposit_ref']}`")
-            d_sub = st.form_submit_button("Record Cash Deposit", use_container_width=True)
-
-        if d_sub:
-            try:
-                from core.services.account_service import AccountService
-                from core.services.transaction_service import TransactionService
-
-                # Find account ID by account number
-                acct_repo = AccountService().account_repo
-                target_acct = acct_repo.find_by_account_number(d_acc)
-
-                if not target_acct:
-                    st.error("Account not found. Please verify account number.")
-                else:
-                    txn_svc = TransactionService()
-                    res = txn_svc.deposit(
-                        account_id=target_acct.account_id,
-                        amount=Decimal(str(d_amt)),
-                        description=d_nar,
-                        performed_by=sd["user_id"],
-                        txn_type="CASH_DEPOSIT",
-                        reference=st.session_state["admin_deposit_ref"]
-                    )
-                    st.success(f"Cash deposit recorded! Ref: {res['reference']}")
-                    st.session_state.pop("admin_deposit_ref")
-                    st.balloons()
-            except Exception as e:
-                st.error(f"{e}")
+        _deposit_fragment(sd["user_id"])
 
     # -------------------------------------------------------
     # TAB 2: User Management (Consolidated)
@@ -196,89 +458,15 @@ elif is_admin():
     with tab_users:
         # Pending section
         st.subheader("Pending Approvals")
-        try:
-            from core.services.authentication_service import AuthenticationService
-            from core.repositories.customer_repository import CustomerRepository
-            auth = AuthenticationService()
-            pending_users = auth.user_repo.get_pending_registrations()
-
-            if not pending_users:
-                st.info("No pending approvals.")
-            else:
-                st.metric("Pending Approvals", len(pending_users))
-                cust_repo = CustomerRepository()
-                for user in pending_users:
-                    customer = cust_repo.find_customer_by_id(user.user_id)
-                    cust_name = customer.full_name if customer else "N/A"
-                    with st.expander(f"Review: {cust_name} (@{user.username})"):
-                        st.markdown(f"**Phone:** {user.phone} | **DOB:** {customer.dob if customer else 'N/A'}")
-                        b1, b2 = st.columns(2)
-                        if b1.button("Approve", key=f"apprv_{user.user_id}", use_container_width=True):
-                            auth.approve_user(user.user_id, sd["user_id"])
-                            st.rerun()
-                        if b2.button("Reject", key=f"rej_{user.user_id}", use_container_width=True):
-                            auth.reject_kyc(user.user_id, sd["user_id"], "Rejected by admin")
-                            st.rerun()
-        except Exception as e:
-            st.error(f"Error: {e}")
+        _pending_fragment(sd["user_id"])
 
         st.markdown("---")
         st.subheader("Quick Create User")
-        with st.expander("New User Form", expanded=False):
-            with st.form("create_user_form"):
-                cu_col1, cu_col2 = st.columns(2)
-                with cu_col1:
-                    new_username = st.text_input("Username")
-                    new_password = st.text_input("Password", type="password")
-                with cu_col2:
-                    new_role = st.selectbox("Role", ["customer", "admin"])
-                    confirm_password = st.text_input("Confirm Password", type="password")
-
-                create_submitted = st.form_submit_button("Create User", use_container_width=True)
-
-            if create_submitted:
-                if new_password != confirm_password:
-                    st.error("Passwords do not match.")
-                else:
-                    try:
-                        from core.models.entities import UserRole
-                        auth = AuthenticationService()
-                        auth.create_user(new_username, new_password, UserRole(new_role), sd["user_id"])
-                        st.success(f"User {new_username} created!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"{e}")
+        _create_user_fragment(sd["user_id"])
 
         st.markdown("---")
         st.subheader("All System Users")
-        if st.button("Load User List", use_container_width=True):
-            try:
-                from core.repositories.user_repository import UserRepository
-                repo = UserRepository()
-                st.session_state["admin_user_list"] = repo.get_all()
-            except Exception as e:
-                st.error(f"{e}")
-
-        if "admin_user_list" in st.session_state:
-            for user in st.session_state["admin_user_list"]:
-                status = user.registration_status
-                role_label = user.role.value if hasattr(user.role, 'value') else str(user.role)
-                with st.expander(f"{user.username} - {role_label.title()} ({status})"):
-                    bc1, bc2 = st.columns(2)
-                    if status == "blocked":
-                        if bc1.button(f"Unblock {user.username}", key=f"unbl_{user.user_id}", use_container_width=True):
-                            AuthenticationService().unblock_user(user.user_id, sd["user_id"])
-                            st.session_state.pop("admin_user_list")
-                            st.rerun()
-                    else:
-                        if bc1.button(f"Block {user.username}", key=f"bl_{user.user_id}", use_container_width=True):
-                            AuthenticationService().block_user(user.user_id, sd["user_id"], "Admin action")
-                            st.session_state.pop("admin_user_list")
-                            st.rerun()
-                    
-                    if bc2.button(f"Force Logout {user.username}", key=f"flog_{user.user_id}", use_container_width=True):
-                        AuthenticationService().force_logout(user.user_id, sd["user_id"])
-                        st.toast(f"Sessions invalidated for {user.username}")
+        _user_list_fragment(sd["user_id"])
 
     # -------------------------------------------------------
     # TAB 3: Account Actions (Freeze/Unfreeze)
@@ -289,36 +477,10 @@ elif is_admin():
 
         fcol1, fcol2 = st.columns(2)
         with fcol1:
-            st.markdown("#### Freeze Account")
-            with st.form("freeze_form"):
-                acc_to_freeze = st.text_input("Account Number", placeholder="SC-SAV-...")
-                freeze_reason = st.text_input("Reason", placeholder="Suspicious activity")
-                if st.form_submit_button("Freeze Account", use_container_width=True):
-                    try:
-                        from core.services.account_service import AccountService
-                        asvc = AccountService()
-                        acct = asvc.account_repo.find_by_account_number(acc_to_freeze)
-                        if not acct: st.error("Account not found")
-                        else:
-                            asvc.freeze_account(acct.account_id, freeze_reason, sd["user_id"])
-                            st.success(f"Account {acc_to_freeze} frozen.")
-                    except Exception as e: st.error(f"{e}")
+            _freeze_fragment(sd["user_id"])
 
         with fcol2:
-            st.markdown("#### Unfreeze Account")
-            with st.form("unfreeze_form"):
-                acc_to_unfreeze = st.text_input("Account Number", placeholder="SC-SAV-...")
-                unfreeze_reason = st.text_input("Reason", placeholder="Issue resolved")
-                if st.form_submit_button("Unfreeze Account", use_container_width=True):
-                    try:
-                        from core.services.account_service import AccountService
-                        asvc = AccountService()
-                        acct = asvc.account_repo.find_by_account_number(acc_to_unfreeze)
-                        if not acct: st.error("Account not found")
-                        else:
-                            asvc.unfreeze_account(acct.account_id, unfreeze_reason, sd["user_id"])
-                            st.success(f"Account {acc_to_unfreeze} unfrozen.")
-                    except Exception as e: st.error(f"{e}")
+            _unfreeze_fragment(sd["user_id"])
 
     # -------------------------------------------------------
     # TAB 4: Audit Logs
@@ -326,32 +488,7 @@ elif is_admin():
     with tab_audit:
         st.subheader("System Audit Trail")
         st.caption("Review critical system events and administrative actions.")
-        
-        if st.button("Refresh Audit Logs", use_container_width=True):
-            try:
-                from core.services.audit_service import AuditService
-                st.session_state["admin_audit_logs"] = AuditService().get_latest_activity(50)
-            except Exception as e:
-                st.error(f"{e}")
-
-        if "admin_audit_logs" in st.session_state:
-            import json
-            import pandas as pd
-            logs = st.session_state["admin_audit_logs"]
-            log_data = []
-            for l in logs:
-                details = l['details']
-                if isinstance(details, str):
-                    try: details = json.loads(details)
-                    except: pass
-                log_data.append({
-                    "Time": format_date(l['created_at']),
-                    "Actor ID": l['actor_id'],
-                    "Role": l['role'].upper(),
-                    "Action": l['action'],
-                    "Details": str(details)
-                })
-            st.table(pd.DataFrame(log_data))
+        _audit_fragment()
 
     # -------------------------------------------------------
     # TAB 5: System Health
@@ -360,10 +497,7 @@ elif is_admin():
         st.subheader("System Status & Maintenance")
         
         h1, h2, h3 = st.columns(3)
-        try:
-            from db.database import db_manager
-            db_conn = "Connected" if db_manager.db_config.test_connection() else "Disconnected"
-        except: db_conn = "Error"
+        db_conn = _db_status()
         
         h1.metric("Database", db_conn)
         h2.metric("Application", "Online")
@@ -371,25 +505,7 @@ elif is_admin():
 
         st.markdown("---")
         st.markdown("#### Session Management")
-        c_cl, c_act = st.columns(2)
-        with c_cl:
-            if st.button("Cleanup Expired Sessions", use_container_width=True):
-                try:
-                    from core.services.authentication_service import AuthenticationService
-                    count = AuthenticationService().cleanup_expired_sessions()
-                    st.success(f"Cleaned {count} sessions.")
-                except Exception as e: st.error(f"{e}")
-        
-        with c_act:
-            if st.button("View Active Sessions", use_container_width=True):
-                try:
-                    from core.services.authentication_service import AuthenticationService
-                    st.session_state["admin_active_sessions"] = AuthenticationService().get_active_sessions()
-                except Exception as e: st.error(f"{e}")
-
-        if "admin_active_sessions" in st.session_state:
-            for s in st.session_state["admin_active_sessions"]:
-                st.write(f"- **{s['username']}** (ID: {s['user_id']}) from {s.get('ip_address', 'Unknown')} at {format_date(s['login_time'])}")
+        _sessions_fragment()
 
 
 # Fallback - if no role matches
@@ -398,5 +514,4 @@ else:
     st.info("No banking services are available for your current role. Please contact the administrator.")
 
     if st.button("Logout"):
-        from utils.auth_guard import handle_logout
         handle_logout()
@@ -8,6 +8,7 @@ import streamlit as st
 from utils.auth_guard import require_role, get_current_user
 from utils.sidebar import render_sidebar
 from utils.formatters import format_date
+from utils.services import get_auth_service, load_customer_info
 
 require_role(["admin", "customer"])
 render_sidebar()
@@ -27,8 +28,7 @@ with col1:
 
     # Fetch additional customer info
     try:
-        from core.repositories.customer_repository import CustomerRepository
-        customer = CustomerRepository().find_customer_by_id(sd["user_id"])
+        customer = load_customer_info(sd["user_id"])
         if customer:
             st.markdown("---")
             st.markdown("### Personal Details")
@@ -66,9 +66,7 @@ if change_submitted:
         st.error("Password must be at least 6 characters.")
     else:
         try:
-            from core.services.authentication_service import AuthenticationService
-            auth = AuthenticationService()
-            auth.change_password(sd["user_id"], old_pwd, new_pwd)
+            get_auth_service().change_password(sd["user_id"], old_pwd, new_pwd)
             st.success("Password changed successfully!")
         except Exception as e:
             st.error(f"{e}")
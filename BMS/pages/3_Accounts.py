@@ -3,23 +3,63 @@ Accounts Page - Create, search, and view bank accounts.
 Roles: admin, customer
 """
 
-import streamlit as st
+import time
+from decimal import Decimal
 
+import streamlit as st
 
+from core.models.entities import AccountType
 from utils.auth_guard import require_role, get_current_user, is_admin
 from utils.sidebar import render_sidebar
-from utils.formatters import format_currency, format_date, status_badge, to_decimal
+from utils.formatters import format_currency, format_date, status_badge
+from utils.services import get_account_service, get_cust_repo, load_customer_accounts, invalidate_customer_accounts
 
 require_role(["admin", "customer"])
 render_sidebar()
 
 sd = get_current_user()
+admin = is_admin()
+
+
+def _throttled(slot: str, query, fn, min_interval: float = 0.3):
+    """Reuse the result of an identical lookup issued within min_interval seconds.
+
+    Only the latest query per slot (one per search widget) is kept, so the cache stays bounded.
+    """
+    cache = st.session_state.setdefault("_query_throttle", {})
+    now = time.monotonic()
+    hit = cache.get(slot)
+    if hit and hit[0] == query and now - hit[1] < min_interval:
+        return hit[2]
+    result = fn()
+    cache[slot] = (query, now, result)
+    return result
+
+
+# (field, default) pairs read from either a summary dict or an Account entity
+_ACCOUNT_ROW_FIELDS = (
+    ("account_id", None), ("user_id", None), ("account_number", "N/A"), ("balance", 0),
+    ("account_type", "N/A"), ("status", "active"), ("interest_rate", "N/A"),
+    ("branch_code", "N/A"), ("opening_date", "N/A"),
+)
+
+
+def _as_account_row(acc) -> dict:
+    """Normalize an account dict or entity into one display dict."""
+    get = acc.get if isinstance(acc, dict) else (lambda k, d: getattr(acc, k, d))
+    row = {k: get(k, d) for k, d in _ACCOUNT_ROW_FIELDS}
+    row["available_balance"] = get("available_balance", row["balance"])
+    for k in ("account_type", "status"):
+        if hasattr(row[k], "value"):
+            row[k] = row[k].value
+    return row
+
 
 st.title("Account Management")
 st.markdown("---")
 
 # ---------- Tabs ----------
-if is_admin():
+if admin:
     tab_titles = ["Create Account", "Search Account", "Account Details"]
     tab_list = st.tabs(tab_titles)
     tab_create, tab_search, tab_details = tab_list
@@ -33,40 +73,39 @@ else:
 # TAB: Create Account (Admin) / Open New Account (Customer)
 # ========================================================
 with tab_create:
-    if is_admin():
+    if admin:
         st.subheader("Create New Bank Account")
         st.markdown("#### 1. Select Customer")
     else:
         st.subheader("Open New Bank Account")
         # Auto-select the current user for customers
-        from core.repositories.customer_repository import CustomerRepository
-        customer = CustomerRepository().find_customer_by_id(sd['user_id'])
+        customer = get_cust_repo().find_customer_by_id(sd['user_id'])
         if customer:
             st.session_state["selected_customer"] = customer
         st.markdown("#### 1. Verify Your Information")
-    if is_admin():
-        cust_col1, cust_col2 = st.columns([3, 1])
-        with cust_col1:
-            cust_search = st.text_input(
-                "Search customer by User ID, phone, or email",
-                key="cust_search_input",
-                placeholder="Enter user ID, phone, or email",
-            )
-        with cust_col2:
-            st.markdown("<br>", unsafe_allow_html=True)
-            search_cust_btn = st.button("Search Customer", key="search_cust_btn")
+    if admin:
+        # Form: typing does not rerun the page, only the submit does
+        with st.form("cust_search_form"):
+            cust_col1, cust_col2 = st.columns([3, 1])
+            with cust_col1:
+                cust_search = st.text_input(
+                    "Search customer by User ID, phone, or email",
+                    key="cust_search_input",
+                    placeholder="Enter user ID, phone, or email",
+                )
+            with cust_col2:
+                st.markdown("<br>", unsafe_allow_html=True)
+                search_cust_btn = st.form_submit_button("Search Customer")
     else:
         search_cust_btn = False
 
     if search_cust_btn and cust_search:
         try:
-            from core.repositories.customer_repository import CustomerRepository
-
-            repo = CustomerRepository()
+            repo = get_cust_repo()
             # Try numeric ID first, then fall back to search by phone/email
             customer = None
             if cust_search.isdigit():
-                customer = repo.find_customer_by_id(int(cust_search))
+                customer = _throttled("q_cust", cust_search, lambda: repo.find_customer_by_id(int(cust_search)))
 
             if customer:
                 st.session_state["selected_customer"] = customer
@@ -78,8 +117,8 @@ with tab_create:
         except Exception as e:
             st.error(f"Search error: {e}")
 
-    if "selected_customer" in st.session_state:
-        c = st.session_state["selected_customer"]
+    c = st.session_state.get("selected_customer")
+    if c is not None:
         with st.expander("Selected Customer Details", expanded=True):
             mc1, mc2 = st.columns(2)
             mc1.markdown(f"**Name:** {c.full_name}")
@@ -111,10 +150,7 @@ with tab_create:
             st.error("Initial deposit cannot be negative.")
         else:
             try:
-                from core.services.account_service import AccountService
-                from core.models.entities import AccountType
-
-                svc = AccountService()
+                svc = get_account_service()
                 type_map = {
                     "savings": AccountType.SAVINGS,
                     "current": AccountType.CURRENT,
@@ -123,11 +159,12 @@ with tab_create:
                 result = svc.create_account(
                     user_id=st.session_state["selected_customer"].user_id,
                     account_type=type_map[acc_type],
-                    initial_deposit=to_decimal(initial_deposit),
+                    initial_deposit=Decimal(f"{initial_deposit:.2f}"),
                     branch_code=branch_code or None,
                 )
                 st.success(f"Account created! Account Number: **{result.get('account_number', 'N/A')}**")
-                st.balloons()
+                invalidate_customer_accounts()
+                st.toast(f"Account {result.get('account_number', 'N/A')} created", icon="✅")
             except Exception as e:
                 st.error(f"{e}")
 
@@ -135,18 +172,20 @@ with tab_create:
 # TAB 2 - Search Account
 # ===========================
 with tab_search:
-    if is_admin():
+    if admin:
         st.subheader("Search Accounts")
-        s_col1, s_col2 = st.columns([3, 1])
-        with s_col1:
-            acc_query = st.text_input(
-                "Enter account number or user ID",
-                key="acc_search_query",
-                placeholder="Account number or user ID",
-            )
-        with s_col2:
-            st.markdown("<br>", unsafe_allow_html=True)
-            search_acc_btn = st.button("Search", key="search_acc_btn")
+        with st.form("acc_search_form"):
+            s_col1, s_col2 = st.columns([3, 1])
+            with s_col1:
+                acc_query = st.text_input(
+                    "Enter account number or user ID",
+                    key="acc_search_query",
+                    placeholder="Account number or user ID",
+                )
+            with s_col2:
+                st.markdown("<br>", unsafe_allow_html=True)
+                search_acc_btn = st.form_submit_button("Search")
+        qint = int(acc_query) if acc_query.isdigit() else None
     else:
         st.subheader("My Accounts")
         search_acc_btn = True
@@ -154,86 +193,51 @@ with tab_search:
 
     if search_acc_btn and acc_query:
         try:
-            from core.services.account_service import AccountService
-            svc = AccountService()
+            svc = get_account_service()
             accounts = []
 
-            if is_admin():
-                if acc_query.isdigit():
-                    # Try as user ID - admins see ALL accounts (active, frozen, closed)
-                    accts = svc.get_customer_accounts(int(acc_query), active_only=False)
-                    if accts:
-                        accounts = accts if isinstance(accts, list) else [accts]
-
-                if not accounts:
-                    # Try as account number - get details
-                    try:
-                        detail = svc.get_account_details(int(acc_query)) if acc_query.isdigit() else None
-                        if detail:
-                            accounts = [detail]
-                    except Exception:
-                        pass
+            if admin:
+                if qint is not None:
+                    # As user ID (admins see ALL accounts: active, frozen, closed), else as account ID
+                    accounts = _throttled("q_acc", qint, lambda: svc.search_accounts_by_int(qint))
             else:
-                # Customer only sees their own active accounts
-                accounts = svc.get_customer_accounts(sd['user_id'])
+                # Customer only sees their own active accounts (runs on every rerun, so read through the cache)
+                accounts = load_customer_accounts(sd['user_id'])
 
             if accounts:
                 st.session_state["search_results"] = accounts
-                if is_admin():
+                if admin:
                     st.success(f"Found {len(accounts)} account(s).")
             else:
                 st.warning("No accounts found.")
         except Exception as e:
             st.error(f"Search error: {e}")
 
-    if "search_results" in st.session_state:
-        results = st.session_state["search_results"]
+    results = st.session_state.get("search_results")
+    if results is not None:
         for acc in results:
-            if isinstance(acc, dict):
-                acc_num = acc.get("account_number", "N/A")
-                acc_id = acc.get("account_id", "")
-                bal = acc.get("balance", 0)
-                available = acc.get("available_balance", bal)
-                atype = acc.get("account_type", "")
-                astatus = acc.get("status", "active")
-
-                # Extra details for enrichment
-                interest = acc.get("interest_rate", "N/A")
-                branch = acc.get("branch_code", "N/A")
-                opened = acc.get("opening_date", "N/A")
-            else:
-                acc_num = getattr(acc, "account_number", "N/A")
-                acc_id = getattr(acc, "account_id", "")
-                bal = getattr(acc, "balance", 0)
-                available = getattr(acc, "available_balance", bal)
-                atype = getattr(acc, "account_type", "")
-                if hasattr(atype, "value"):
-                    atype = atype.value
-                astatus = getattr(acc, "status", "active")
-                if hasattr(astatus, "value"):
-                    astatus = astatus.value
-
-                # Extra details for enrichment
-                od_limit = getattr(acc, "od_limit", 0)
-                interest = getattr(acc, "interest_rate", "N/A")
-                branch = getattr(acc, "branch_code", "N/A")
-                opened = getattr(acc, "opening_date", "N/A")
+            row = _as_account_row(acc)
+            acc_num, acc_id, bal, available = row["account_number"], row["account_id"], row["balance"], row["available_balance"]
+            atype, astatus = row["account_type"], row["status"]
+
+            # Extra details for enrichment
+            interest, branch, opened = row["interest_rate"], row["branch_code"], row["opening_date"]
 
             with st.expander(f"Account {acc_num}  -  {status_badge(str(astatus))}"):
                 r1, r2, r3 = st.columns(3)
                 r1.metric("Current Balance", format_currency(bal))
-                r2.metric("Available Funds", format_currency(available if 'available' in locals() else bal))
+                r2.metric("Available Funds", format_currency(available))
                 r3.markdown(f"**Type:** {str(atype).title()}")
 
                 st.markdown("---")
-                if not is_admin():
+                if not admin:
                     d1, d2, d3 = st.columns(3)
                     d1.markdown(f"**Status:** {status_badge(str(astatus))}")
-                    d2.markdown(f"**Branch:** `{branch if 'branch' in locals() else 'N/A'}`")
-                    d3.markdown(f"**Interest Rate:** {interest if 'interest' in locals() else 'N/A'}%")
+                    d2.markdown(f"**Branch:** `{branch}`")
+                    d3.markdown(f"**Interest Rate:** {interest}%")
 
                     e1, e2 = st.columns(2)
-                    e1.markdown(f"**Opening Date:** {format_date(opened) if 'opened' in locals() and opened != 'N/A' else 'N/A'}")
+                    e1.markdown(f"**Opening Date:** {format_date(opened) if opened != 'N/A' else 'N/A'}")
                     e2.caption(f"Internal ID: {acc_id}")
                 else:
                     d1, d2 = st.columns(2)
@@ -244,19 +248,18 @@ with tab_search:
 # ===========================
 # TAB: Account Details (Admin Only)
 # ===========================
-if is_admin() and tab_details:
+if admin and tab_details:
     with tab_details:
         st.subheader("Account Details & Actions")
 
-        acc_id_input = st.number_input("Enter Account ID", min_value=1, step=1, key="detail_acc_id")
-        load_btn = st.button("Load Details", key="load_details_btn")
+        with st.form("account_detail_form"):
+            acc_id_input = st.number_input("Enter Account ID", min_value=1, step=1, key="detail_acc_id")
+            load_btn = st.form_submit_button("Load Details")
 
         if load_btn:
             try:
-                from core.services.account_service import AccountService
-
-                svc = AccountService()
-                detail = svc.get_account_details(int(acc_id_input))
+                svc = get_account_service()
+                detail = _throttled("q_detail", int(acc_id_input), lambda: svc.get_account_details(int(acc_id_input)))
                 if detail:
                     st.session_state["account_detail"] = detail
                 else:
@@ -264,35 +267,27 @@ if is_admin() and tab_details:
             except Exception as e:
                 st.error(f"{e}")
 
-        if "account_detail" in st.session_state:
-            det = st.session_state["account_detail"]
+        det = st.session_state.get("account_detail")
+        if det is not None:
 
             # Security check for customers (though tab is admin-only, good for safety)
-            det_user_id = det.get("user_id") if isinstance(det, dict) else getattr(det, "user_id", None)
-            if not is_admin() and det_user_id != sd['user_id']:
+            det_row = _as_account_row(det)
+            det_user_id = det_row["user_id"]
+            if not admin and det_user_id != sd['user_id']:
                 st.error("You are not authorized to view this account.")
                 st.session_state.pop("account_detail", None)
                 st.rerun()
 
-            if isinstance(det, dict):
-                st.markdown(f"### Account: {det.get('account_number', 'N/A')}")
-                d1, d2, d3 = st.columns(3)
-                d1.metric("Balance", format_currency(det.get("balance", 0)))
-                d2.markdown(f"**Type:** {str(det.get('account_type', 'N/A')).title()}")
-                d3.markdown(f"**Status:** {status_badge(str(det.get('status', 'active')))}")
-            else:
-                st.markdown(f"### Account: {getattr(det, 'account_number', 'N/A')}")
-                d1, d2, d3 = st.columns(3)
-                d1.metric("Balance", format_currency(getattr(det, "balance", 0)))
-                atype = getattr(det, "account_type", "N/A")
-                d2.markdown(f"**Type:** {str(atype.value if hasattr(atype, 'value') else atype).title()}")
-                astatus = getattr(det, "status", "active")
-                d3.markdown(f"**Status:** {status_badge(astatus.value if hasattr(astatus, 'value') else str(astatus))}")
+            st.markdown(f"### Account: {det_row['account_number']}")
+            d1, d2, d3 = st.columns(3)
+            d1.metric("Balance", format_currency(det_row["balance"]))
+            d2.markdown(f"**Type:** {str(det_row['account_type']).title()}")
+            d3.markdown(f"**Status:** {status_badge(str(det_row['status']))}")
 
             st.markdown("---")
 
             # Freeze / Unfreeze / Close actions
-            if is_admin():
+            if admin:
                 st.markdown("#### Admin Actions")
                 act1, act2, act3 = st.columns(3)
 
@@ -308,17 +303,17 @@ if is_admin() and tab_details:
                     if st.button("Close Account", key="close_btn"):
                         st.session_state["show_close_confirm"] = True
 
-                det_id = det.get("account_id") if isinstance(det, dict) else getattr(det, "account_id", None)
+                det_id = det_row["account_id"]
 
                 if st.session_state.get("show_freeze_form"):
                     reason = st.text_area("Reason for freezing", key="freeze_reason")
                     if st.button("Confirm Freeze", key="confirm_freeze"):
                         try:
-                            from core.services.account_service import AccountService
-                            AccountService().freeze_account(det_id, reason, sd["user_id"])
+                            get_account_service().freeze_account(det_id, reason, sd["user_id"])
                             st.success("Account frozen.")
                             st.session_state.pop("show_freeze_form", None)
                             st.session_state.pop("account_detail", None)
+                            invalidate_customer_accounts()
                         except Exception as e:
                             st.error(f"{e}")
 
@@ -326,11 +321,11 @@ if is_admin() and tab_details:
                     reason = st.text_area("Reason for unfreezing", key="unfreeze_reason")
                     if st.button("Confirm Unfreeze", key="confirm_unfreeze"):
                         try:
-                            from core.services.account_service import AccountService
-                            AccountService().unfreeze_account(det_id, reason, sd["user_id"])
+                            get_account_service().unfreeze_account(det_id, reason, sd["user_id"])
                             st.success("Account unfrozen.")
                             st.session_state.pop("show_unfreeze_form", None)
                             st.session_state.pop("account_detail", None)
+                            invalidate_customer_accounts()
                         except Exception as e:
                             st.error(f"{e}")
 
@@ -339,10 +334,10 @@ if is_admin() and tab_details:
                     confirm = st.checkbox("I confirm I want to close this account", key="close_confirm_check")
                     if confirm and st.button("Close Account Permanently", key="confirm_close"):
                         try:
-                            from core.services.account_service import AccountService
-                            AccountService().close_account(det_id, sd["user_id"])
+                            get_account_service().close_account(det_id, sd["user_id"])
                             st.success("Account closed.")
                             st.session_state.pop("show_close_confirm", None)
                             st.session_state.pop("account_detail", None)
+                            invalidate_customer_accounts()
                         except Exception as e:
                             st.error(f"{e}")
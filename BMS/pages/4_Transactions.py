@@ -3,19 +3,72 @@ Transactions Page - Deposit, withdraw, transfer, and view statements.
 Roles: admin, customer
 """
 
-import streamlit as st
-import uuid
+import secrets
+from dataclasses import fields
+from decimal import Decimal
+from operator import attrgetter
 
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
 
 from utils.auth_guard import require_role, get_current_user, is_admin
 from utils.sidebar import render_sidebar
-from utils.formatters import format_currency, format_date, to_decimal
+from utils.formatters import format_currency, format_date
+from utils.helpers import StringUtils
+from utils.services import get_txn_service, load_account_options, invalidate_customer_accounts
 
 require_role(["admin", "customer"])
 render_sidebar()
 
 sd = get_current_user()
 
+STATEMENT_COLS = ("txn_id", "txn_type", "amount", "balance_after_txn", "narration", "reference", "txn_time")
+
+
+def _form_reference(key: str, prefix: str) -> str:
+    """Reference for the current form load, generated once and kept until it is used."""
+    ref = st.session_state.get(key)
+    if ref is None:
+        ref = st.session_state[key] = StringUtils.generate_reference_number(prefix)
+    return ref
+
+
+def _review_transfer(customer_accounts: dict):
+    """Transfer form callback: validate inputs and stage the transfer for confirmation."""
+    ss = st.session_state
+    if is_admin():
+        tf_from = ss.get("tf_from")
+    else:
+        tf_from = customer_accounts.get(ss.get("tf_from_select"))
+    tf_to, tf_amount = ss["tf_to"], ss["tf_amount"]
+
+    if not tf_from:
+        ss["transfer_error"] = "Please select a valid source account."
+    elif tf_from == tf_to:
+        ss["transfer_error"] = "From and To accounts must be different."
+    elif tf_amount <= 0:
+        ss["transfer_error"] = "Amount must be greater than zero."
+    else:
+        ss["transfer_pending"] = {
+            "from_account": int(tf_from),
+            "to_account": int(tf_to),
+            "amount": tf_amount,
+            "description": ss.get("tf_desc") or "Fund transfer",
+            "txn_key": secrets.token_hex(16),
+        }
+
+
+def _statement_frame(data: list) -> pd.DataFrame:
+    """Statement DataFrame with every history column (the CSV export uses all of them)."""
+    if isinstance(data[0], dict):
+        return pd.DataFrame.from_records(data)
+    # Read dataclass fields as tuples instead of copying each row into a dict
+    cols = tuple(f.name for f in fields(data[0]))
+    getter = attrgetter(*cols)
+    return pd.DataFrame.from_records([getter(t) for t in data], columns=cols)
+
+
 st.title("Transactions")
 st.markdown("---")
 
@@ -39,15 +92,13 @@ if is_admin() and tab_deposit:
         st.subheader("Process Deposit")
 
         # Idempotency: Generate reference for this form load
-        if "dep_ref" not in st.session_state:
-            from utils.helpers import StringUtils
-            st.session_state["dep_ref"] = StringUtils.generate_reference_number("DEP")
+        dep_ref = _form_reference("dep_ref", "DEP")
 
         with st.form("deposit_form"):
             dep_acc_id = st.number_input("Account ID", min_value=1, step=1, key="dep_acc_id")
             dep_amount = st.number_input("Amount (INR)", min_value=1.0, step=100.0, format="%.2f", key="dep_amount")
             dep_desc = st.text_input("Description / Narration", placeholder="Cash deposit", key="dep_desc")
-            st.caption(f"Transaction ID: `{st.session_state['dep_ref']}`")
+            st.caption(f"Transaction ID: `{dep_ref}`")
             dep_submitted = st.form_submit_button("Process Deposit", use_container_width=True)
 
         if dep_submitted:
@@ -55,18 +106,17 @@ if is_admin() and tab_deposit:
                 st.error("Amount must be greater than zero.")
             else:
                 try:
-                    from core.services.transaction_service import TransactionService
-
-                    txn_svc = TransactionService()
+                    txn_svc = get_txn_service()
                     result = txn_svc.deposit(
                         account_id=int(dep_acc_id),
-                        amount=to_decimal(dep_amount),
+                        amount=Decimal(f"{dep_amount:.2f}"),
                         description=dep_desc or "Cash deposit",
                         performed_by=sd.get("user_id"),
-                        reference=st.session_state["dep_ref"]
+                        reference=dep_ref
                     )
                     st.success(f"Deposit successful! Reference: **{result.get('reference', 'N/A')}**")
                     st.session_state.pop("dep_ref")
+                    invalidate_customer_accounts()
                     st.metric("New Balance", format_currency(result.get("balance_after", 0)))
                 except Exception as e:
                     st.error(f"{e}")
@@ -79,15 +129,13 @@ if is_admin() and tab_withdraw:
         st.subheader("Process Withdrawal")
 
         # Idempotency: Generate reference for this form load
-        if "wd_ref" not in st.session_state:
-            from utils.helpers import StringUtils
-            st.session_state["wd_ref"] = StringUtils.generate_reference_number("WDR")
+        wd_ref = _form_reference("wd_ref", "WDR")
 
         with st.form("withdraw_form"):
             wd_acc_id = st.number_input("Account ID", min_value=1, step=1, key="wd_acc_id")
             wd_amount = st.number_input("Amount (INR)", min_value=1.0, step=100.0, format="%.2f", key="wd_amount")
             wd_desc = st.text_input("Description / Narration", placeholder="Cash withdrawal", key="wd_desc")
-            st.caption(f"Transaction ID: `{st.session_state['wd_ref']}`")
+            st.caption(f"Transaction ID: `{wd_ref}`")
             wd_submitted = st.form_submit_button("Process Withdrawal", use_container_width=True)
 
         if wd_submitted:
@@ -95,18 +143,17 @@ if is_admin() and tab_withdraw:
                 st.error("Amount must be greater than zero.")
             else:
                 try:
-                    from core.services.transaction_service import TransactionService
-
-                    txn_svc = TransactionService()
+                    txn_svc = get_txn_service()
                     result = txn_svc.withdraw(
                         account_id=int(wd_acc_id),
-                        amount=to_decimal(wd_amount),
+                        amount=Decimal(f"{wd_amount:.2f}"),
                         description=wd_desc or "Cash withdrawal",
                         performed_by=sd.get("user_id"),
-                        reference=st.session_state["wd_ref"]
+                        reference=wd_ref
                     )
                     st.success(f"Withdrawal successful! Reference: **{result.get('reference', 'N/A')}**")
                     st.session_state.pop("wd_ref")
+                    invalidate_customer_accounts()
                     st.metric("New Balance", format_currency(result.get("balance_after", 0)))
                 except Exception as e:
                     st.error(f"{e}")
@@ -123,49 +170,34 @@ with tab_transfer:
         customer_accounts = {}
         if not is_admin():
             try:
-                from core.services.account_service import AccountService
-                my_accounts = AccountService().get_customer_accounts(sd.get("user_id"))
-                if my_accounts:
-                    customer_accounts = {f"{a['account_number']} ({format_currency(a['balance'])})": a['account_id'] for a in my_accounts}
+                customer_accounts = load_account_options(sd.get("user_id"))
             except Exception:
                 pass
 
-        with st.form("transfer_form"):
-            if is_admin():
-                tf_from = st.number_input("From Account ID", min_value=1, step=1, key="tf_from")
-            else:
-                if customer_accounts:
-                    tf_from_str = st.selectbox("From Account", options=list(customer_accounts.keys()), key="tf_from_select")
-                    tf_from = customer_accounts.get(tf_from_str)
+        if not is_admin() and not customer_accounts:
+            # Nothing to transfer from: skip the form entirely
+            st.warning("No accounts found to transfer from.")
+        else:
+            with st.form("transfer_form"):
+                if is_admin():
+                    st.number_input("From Account ID", min_value=1, step=1, key="tf_from")
                 else:
-                    st.warning("No accounts found to transfer from.")
-                    tf_from = None
-
-            tf_to = st.number_input("To Account ID", min_value=1, step=1, key="tf_to")
-            tf_amount = st.number_input("Amount (INR)", min_value=1.0, step=100.0, format="%.2f", key="tf_amount")
-            tf_desc = st.text_input("Description", placeholder="Fund transfer", key="tf_desc")
-            tf_submitted = st.form_submit_button("Review Transfer", use_container_width=True)
-
-        if tf_submitted:
-            if not tf_from:
-                st.error("Please select a valid source account.")
-            elif tf_from == tf_to:
-                st.error("From and To accounts must be different.")
-            elif tf_amount <= 0:
-                st.error("Amount must be greater than zero.")
-            else:
-                st.session_state["transfer_pending"] = {
-                    "from_account": int(tf_from),
-                    "to_account": int(tf_to),
-                    "amount": tf_amount,
-                    "description": tf_desc or "Fund transfer",
-                    "txn_key": str(uuid.uuid4()),
-                }
-                st.rerun()
+                    st.selectbox("From Account", options=list(customer_accounts.keys()), key="tf_from_select")
+
+                st.number_input("To Account ID", min_value=1, step=1, key="tf_to")
+                st.number_input("Amount (INR)", min_value=1.0, step=100.0, format="%.2f", key="tf_amount")
+                st.text_input("Description", placeholder="Fund transfer", key="tf_desc")
+                # The callback stages the transfer before the submit's own rerun, so step 2 renders straight away
+                st.form_submit_button("Review Transfer", use_container_width=True,
+                                      on_click=_review_transfer, args=(customer_accounts,))
+
+            tf_error = st.session_state.pop("transfer_error", None)
+            if tf_error:
+                st.error(tf_error)
 
     # Step 2: Confirm
-    if "transfer_pending" in st.session_state:
-        tp = st.session_state["transfer_pending"]
+    tp = st.session_state.get("transfer_pending")
+    if tp is not None:
         st.warning("Please review the transfer details below before confirming.")
 
         st.markdown(f"""
@@ -181,27 +213,25 @@ with tab_transfer:
         with c1:
             if st.button("Confirm Transfer", use_container_width=True, key="confirm_transfer"):
                 try:
-                    from core.services.transaction_service import TransactionService
-
-                    txn_svc = TransactionService()
+                    txn_svc = get_txn_service()
                     result = txn_svc.transfer(
                         from_account_id=tp["from_account"],
                         to_account_id=tp["to_account"],
-                        amount=to_decimal(tp["amount"]),
+                        amount=Decimal(f"{tp['amount']:.2f}"),
                         description=tp["description"],
                         performed_by=sd.get("user_id"),
                         reference=tp["txn_key"]
                     )
                     st.success(f"Transfer successful! Reference: **{result.get('reference', 'N/A')}**")
                     del st.session_state["transfer_pending"]
+                    invalidate_customer_accounts()
                 except Exception as e:
                     st.error(f"{e}")
                     del st.session_state["transfer_pending"]
 
         with c2:
-            if st.button("Cancel", use_container_width=True, key="cancel_transfer"):
-                del st.session_state["transfer_pending"]
-                st.rerun()
+            st.button("Cancel", use_container_width=True, key="cancel_transfer",
+                      on_click=st.session_state.pop, args=("transfer_pending", None))
 
 # ===========================
 # TAB 4 - Statement
@@ -209,39 +239,40 @@ with tab_transfer:
 with tab_statement:
     st.subheader("Account Statement")
 
-    st_col1, st_col2 = st.columns([2, 1])
-
     selected_acc_id = None
 
-    with st_col1:
-        if is_admin():
-            stmt_acc_id = st.number_input("Account ID", min_value=1, step=1, key="stmt_acc_id")
-            selected_acc_id = stmt_acc_id
-        else:
-            # For customers, show dropdown of their accounts
-            from core.services.account_service import AccountService
-            try:
-                my_accounts = AccountService().get_customer_accounts(sd.get("user_id"))
-                if my_accounts:
-                    # Create options list: "Account Number (Balance)"
-                    acc_options = {f"{a['account_number']} ({format_currency(a['balance'])})": a['account_id'] for a in my_accounts}
-                    selected_option = st.selectbox("Select Account", options=list(acc_options.keys()), key="stmt_acc_select")
-                    selected_acc_id = acc_options[selected_option]
-                else:
-                    st.warning("No accounts found.")
-            except Exception as e:
-                st.error(f"Error fetching accounts: {e}")
+    # Form: changing the account or limit does not rerun the page until submit
+    with st.form("statement_form"):
+        st_col1, st_col2 = st.columns([2, 1])
+
+        with st_col1:
+            if is_admin():
+                stmt_acc_id = st.number_input("Account ID", min_value=1, step=1, key="stmt_acc_id")
+                selected_acc_id = stmt_acc_id
+            else:
+                # For customers, show dropdown of their accounts
+                try:
+                    # Options: "Account Number (Balance)" -> account_id
+                    acc_options = load_account_options(sd.get("user_id"))
+                    if acc_options:
+                        selected_option = st.selectbox("Select Account", options=list(acc_options.keys()), key="stmt_acc_select")
+                        selected_acc_id = acc_options[selected_option]
+                    else:
+                        st.warning("No accounts found.")
+                except Exception as e:
+                    st.error(f"Error fetching accounts: {e}")
 
-    with st_col2:
-        stmt_limit = st.number_input("Max records", min_value=10, max_value=500, value=50, step=10, key="stmt_limit")
+        with st_col2:
+            stmt_limit = st.number_input("Max records", min_value=10, max_value=500, value=50, step=10, key="stmt_limit")
 
-    load_stmt = st.button("Load Statement", key="load_stmt_btn", disabled=(selected_acc_id is None))
+        load_stmt = st.form_submit_button("Load Statement", disabled=(selected_acc_id is None))
 
     if load_stmt and selected_acc_id:
+        # Drop the previous statement so an empty or failed load never shows stale rows
+        st.session_state.pop("statement_arrow", None)
+        st.session_state.pop("statement_csv", None)
         try:
-            from core.services.transaction_service import TransactionService
-
-            txn_svc = TransactionService()
+            txn_svc = get_txn_service()
             history = txn_svc.get_transaction_history(
                 account_id=int(selected_acc_id),
                 performed_by=sd.get("user_id"),
@@ -249,44 +280,32 @@ with tab_statement:
             )
 
             if history:
-                st.session_state["statement_data"] = history
+                # Convert once per load; reruns reuse the Arrow table as-is
+                df = _statement_frame(history)
+                display_cols = [c for c in STATEMENT_COLS if c in df.columns] or list(df.columns)
+                st.session_state["statement_arrow"] = pa.Table.from_pandas(df[display_cols], preserve_index=False)
+                st.session_state["statement_csv"] = df.to_csv(index=False).encode("utf-8")
             else:
                 st.info("No transactions found for this account.")
         except Exception as e:
             st.error(f"{e}")
 
-    if "statement_data" in st.session_state:
-        data = st.session_state["statement_data"]
-        if isinstance(data, list) and len(data) > 0:
-            import pandas as pd
-
-            if isinstance(data[0], dict):
-                df = pd.DataFrame(data)
-            else:
-                # Convert dataclass objects to dicts
-                df = pd.DataFrame([vars(t) for t in data])
+    statement_arrow = st.session_state.get("statement_arrow")
+    if statement_arrow is not None:
+        st.dataframe(statement_arrow, use_container_width=True)
 
-            display_cols = [c for c in ["txn_id", "txn_type", "amount", "balance_after_txn", "narration", "reference", "txn_time"] if c in df.columns]
-            if display_cols:
-                st.dataframe(df[display_cols], use_container_width=True)
-            else:
-                st.dataframe(df, use_container_width=True)
-
-            # Download button
-            csv = df.to_csv(index=False)
-            st.download_button("Download CSV", csv, file_name="statement.csv", mime="text/csv")
-        else:
-            st.info("No transaction data available.")
+        # Download button
+        st.download_button("Download CSV", st.session_state["statement_csv"], file_name="statement.csv", mime="text/csv")
 
     # ---- Search by reference ----
     st.markdown("---")
     st.markdown("#### Search Transaction by Reference")
-    ref_input = st.text_input("Reference Number", key="txn_ref_input", placeholder="TXN-XXXXXXXX")
-    if st.button("Search", key="search_ref_btn") and ref_input:
+    with st.form("ref_search_form"):
+        ref_input = st.text_input("Reference Number", key="txn_ref_input", placeholder="TXN-XXXXXXXX")
+        search_ref = st.form_submit_button("Search")
+    if search_ref and ref_input:
         try:
-            from core.services.transaction_service import TransactionService
-
-            txn_svc = TransactionService()
+            txn_svc = get_txn_service()
             txn = txn_svc.get_transaction_by_reference(ref_input)
             if txn:
                 if isinstance(txn, dict):
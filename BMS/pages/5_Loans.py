@@ -7,43 +7,103 @@ RBAC Rules:
   ADMIN    -> sees all loans, can apply for any user
 """
 
+import pandas as pd
 import streamlit as st
-from decimal import Decimal
+from enum import Enum
+from operator import attrgetter
 
+from core.models.entities import LoanType
 from utils.auth_guard import require_role, get_current_user, is_admin
+from utils.helpers import StringUtils
 from utils.sidebar import render_sidebar
 from utils.formatters import format_currency, format_date, status_badge, to_decimal
-from core.services.loan_service import LoanService, ALLOWED_TENURES
+from utils.services import (
+    get_loan_service, load_linked_account_options, load_all_loans, load_user_loans,
+    load_pending_loans, invalidate_loans
+)
+from core.services.loan_service import ALLOWED_TENURES, estimate_emi, estimate_emi_totals, preview_rate
 
 require_role(["admin", "customer"])
 render_sidebar()
 
 sd = get_current_user()
 _uid = sd["user_id"]  # Always the session user - never from UI input for customers
+admin = is_admin()
 
 st.title("Loan Management")
 st.markdown("---")
 
-tabs = ["Apply for Loan", "My Loans" if not is_admin() else "All Loans", "EMI Calculator"]
-if is_admin():
+tabs = ["Apply for Loan", "All Loans" if admin else "My Loans", "EMI Calculator"]
+if admin:
     tabs.append("Approvals")
 
 tab_list = st.tabs(tabs)
 tab_apply  = tab_list[0]
 tab_active = tab_list[1]
 tab_calc   = tab_list[2]
-tab_approval = tab_list[3] if is_admin() else None
+tab_approval = tab_list[3] if admin else None
+
+loan_svc = get_loan_service()
+
+_TYPE_MAP = {"personal": LoanType.PERSONAL}
+
+_LOAN_COLS = attrgetter(
+    "loan_id", "user_id", "principal_amount", "emi_amount",
+    "tenure_months", "interest_rate_annual", "status"
+)
+_LOAN_HEADERS = ["Loan ID", "User ID", "Principal", "EMI", "Tenure (months)", "Rate (% p.a.)", "Status"]
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, Enum) else status
+
+
+def _loan_fields(loan) -> dict:
+    """Display fields of a loan, with the status enum unwrapped."""
+    row = dict(zip(_LOAN_HEADERS, _LOAN_COLS(loan)))
+    row["Status"] = _status_value(row["Status"])
+    return row
+
+
+def _loan_table(loans: list, show_user: bool = True) -> pd.DataFrame:
+    """All loans as one display frame (a single widget instead of one expander per loan)."""
+    df = pd.DataFrame([_LOAN_COLS(loan) for loan in loans], columns=_LOAN_HEADERS)
+    df["Principal"] = df["Principal"].map(format_currency)
+    df["EMI"] = df["EMI"].map(format_currency)
+    df["Status"] = df["Status"].map(lambda status: status_badge(_status_value(status)))
+    return df if show_user else df.drop(columns="User ID")
+
+
+def _select_loan(loans: list, key: str):
+    """Selectbox over loan IDs; returns the chosen loan or None."""
+    loan_by_id = {loan.loan_id: loan for loan in loans}
+    selected = st.selectbox(
+        "Inspect loan", [None, *loan_by_id], key=key,
+        format_func=lambda lid: "Select a loan..." if lid is None else f"Loan #{lid}"
+    )
+    return loan_by_id.get(selected)
+
+
+def _loan_details(loan):
+    """Metrics for a single loan."""
+    row = _loan_fields(loan)
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Principal", format_currency(row["Principal"]))
+    m2.metric("EMI", format_currency(row["EMI"]))
+    m3.metric("Tenure", f"{row['Tenure (months)']} months")
+    st.markdown(f"**Rate:** {row['Rate (% p.a.)']}% p.a. &nbsp;|&nbsp; **Status:** {status_badge(row['Status'])}")
 
-loan_svc = LoanService()
 
 # -----------------------------------------------------------------------
 # TAB 1 - Apply for Loan
 # -----------------------------------------------------------------------
-with tab_apply:
+@st.fragment
+def _apply_fragment():
+    """Loan application form; widget changes rerun only this tab."""
     st.subheader("New Loan Application")
 
     # Determine target user_id
-    if is_admin():
+    if admin:
         target_user_id = st.number_input(
             "Target User ID (the customer this loan is for)",
             min_value=1, step=1, key="loan_target_user"
@@ -55,11 +115,9 @@ with tab_apply:
 
     # Fetch linked account
     try:
-        from core.services.account_service import AccountService
-        acct_svc = AccountService()
-        user_accounts = acct_svc.get_customer_accounts(int(target_user_id))
+        acc_options = load_linked_account_options(int(target_user_id))
     except Exception:
-        user_accounts = []
+        acc_options = {}
 
     account_id = None  # always initialized before form renders
     with st.form("loan_application_form"):
@@ -72,14 +130,10 @@ with tab_apply:
             )
 
             # Account selector
-            if user_accounts:
-                acc_options = {
-                    f"#{a['account_id']} - {a['account_number']} ({a['account_type'].title()})": a["account_id"]
-                    for a in user_accounts
-                }
+            if acc_options:
                 acc_label = st.selectbox("Linked Account", list(acc_options.keys()), key="loan_acc_select")
                 account_id = acc_options[acc_label]
-            elif is_admin():
+            elif admin:
                 # Admin fallback: manual entry if no accounts found for that user
                 account_id = st.number_input("Linked Account ID", min_value=1, step=1, key="loan_acc_id_admin")
             else:
@@ -93,31 +147,31 @@ with tab_apply:
             )
 
             # Tenure: predefined options only - no free text
-            tenure = st.selectbox(
+            tenure = int(st.selectbox(
                 "Loan Tenure", ALLOWED_TENURES,
                 format_func=lambda m: f"{m} months",
                 key="loan_tenure"
-            )
+            ))
 
             # Interest rate: auto-calculated from slab, read-only
-            auto_rate = loan_svc.get_interest_rate_for_amount(to_decimal(principal))
+            auto_rate = preview_rate(principal)
             st.metric("Interest Rate (p.a.)", f"{auto_rate}%", help="Fixed by loan amount slab. Not affected by tenure.")
 
-        purpose = st.text_area(
+        st.text_area(
             "Purpose / Remarks", key="loan_purpose",
             placeholder="Describe the purpose of the loan"
         )
 
         # EMI preview
         if principal > 0 and tenure > 0:
-            preview_emi = loan_svc.calculate_emi(to_decimal(principal), auto_rate, int(tenure))
+            preview_emi = estimate_emi(principal, float(auto_rate), tenure)
             st.info(f"Estimated Monthly EMI: **{format_currency(preview_emi)}**")
 
-        # Idempotency reference
-        if "loan_app_ref" not in st.session_state:
-            from utils.helpers import StringUtils
-            st.session_state["loan_app_ref"] = StringUtils.generate_reference_number("LON")
-        st.caption(f"Application Ref: `{st.session_state['loan_app_ref']}`")
+        # Idempotency reference: generated once per form load, dropped after a successful submit
+        app_ref = st.session_state.get("loan_app_ref")
+        if app_ref is None:
+            app_ref = st.session_state["loan_app_ref"] = StringUtils.generate_reference_number("LON")
+        st.caption(f"Application Ref: `{app_ref}`")
 
         loan_submitted = st.form_submit_button("Submit Application", use_container_width=True)
 
@@ -126,21 +180,20 @@ with tab_apply:
             st.error("No linked account available. Cannot submit loan.")
         else:
             try:
-                from core.models.entities import LoanType
-                type_map = {"personal": LoanType.PERSONAL}
-
+                principal_dec = to_decimal(principal)
                 created_id = loan_svc.apply_for_loan(
                     user_id=int(target_user_id),
                     account_id=int(account_id),
-                    loan_type=type_map[loan_type],
-                    principal=to_decimal(principal),
-                    tenure_months=int(tenure),
+                    loan_type=_TYPE_MAP[loan_type],
+                    principal=principal_dec,
+                    tenure_months=tenure,
                     created_by=_uid,
-                    reference=st.session_state["loan_app_ref"],
+                    reference=app_ref,
                 )
                 st.session_state.pop("loan_app_ref")
+                invalidate_loans()
 
-                emi = loan_svc.calculate_emi(to_decimal(principal), auto_rate, int(tenure))
+                emi = loan_svc.calculate_emi(principal_dec, auto_rate, tenure)
                 st.success(f"Loan application submitted! Loan ID: **{created_id}**")
                 st.metric("Monthly EMI", format_currency(emi))
             except Exception as e:
@@ -149,83 +202,66 @@ with tab_apply:
 # -----------------------------------------------------------------------
 # TAB 2 - Loans View
 # -----------------------------------------------------------------------
-with tab_active:
-    if is_admin():
+@st.fragment
+def _loans_fragment():
+    """All loans (admin) or the customer's own loans."""
+    if admin:
         st.subheader("All Loans in System")
         col_r, col_b = st.columns([4, 1])
         with col_b:
-            refresh = st.button("Refresh", key="refresh_all_loans")
-
-        if refresh or "all_loans_cache" not in st.session_state:
-            try:
-                st.session_state["all_loans_cache"] = loan_svc.get_all_loans()
-            except Exception as e:
-                st.error(f"{e}")
-                st.session_state["all_loans_cache"] = []
-
-        loans = st.session_state.get("all_loans_cache", [])
+            # The full loan list is fetched only once asked for, not on first page load
+            if st.button("Refresh" if st.session_state.get("all_loans_open") else "Load", key="refresh_all_loans"):
+                st.session_state["all_loans_open"] = True
+                load_all_loans.clear()
+
+        if not st.session_state.get("all_loans_open"):
+            st.info("Click Load to fetch all loans.")
+            return
+
+        try:
+            loans = load_all_loans()
+        except Exception as e:
+            st.error(f"{e}")
+            loans = []
         if not loans:
             st.info("No loans found in the system.")
         else:
             st.caption(f"Showing {len(loans)} loan(s)")
-            for loan in loans:
-                lid     = getattr(loan, "loan_id", "N/A")
-                lamt    = getattr(loan, "principal_amount", 0)
-                lstatus = getattr(loan, "status", "")
-                if hasattr(lstatus, "value"):
-                    lstatus = lstatus.value
-                lemi    = getattr(loan, "emi_amount", 0)
-                ltenure = getattr(loan, "tenure_months", 0)
-                luser   = getattr(loan, "user_id", "N/A")
-                lrate   = getattr(loan, "interest_rate_annual", "N/A")
-
-                with st.expander(f"Loan #{lid} - User {luser} - {format_currency(lamt)} - {status_badge(lstatus)}"):
-                    m1, m2, m3 = st.columns(3)
-                    m1.metric("Principal", format_currency(lamt))
-                    m2.metric("EMI", format_currency(lemi))
-                    m3.metric("Tenure", f"{ltenure} months")
-                    st.markdown(f"**Rate:** {lrate}% p.a. &nbsp;|&nbsp; **Status:** {status_badge(lstatus)}")
+            st.dataframe(_loan_table(loans), use_container_width=True, hide_index=True)
+            loan = _select_loan(loans, "inspect_all_loans")
+            if loan is not None:
+                with st.expander(f"Loan #{loan.loan_id} - User {loan.user_id}", expanded=True):
+                    _loan_details(loan)
 
     else:
         # CUSTOMER: auto-load own loans - no user_id input
         st.subheader("My Loans")
         col_r, col_b = st.columns([4, 1])
         with col_b:
-            refresh = st.button("Refresh", key="refresh_my_loans")
-
-        if refresh or "my_loans_cache" not in st.session_state:
-            try:
-                st.session_state["my_loans_cache"] = loan_svc.get_loans_for_user(_uid)
-            except Exception as e:
-                st.error(f"{e}")
-                st.session_state["my_loans_cache"] = []
-
-        loans = st.session_state.get("my_loans_cache", [])
+            if st.button("Refresh", key="refresh_my_loans"):
+                load_user_loans.clear()
+
+        try:
+            loans = load_user_loans(_uid)
+        except Exception as e:
+            st.error(f"{e}")
+            loans = []
         if not loans:
             st.info("You have no loans on record.")
         else:
             st.caption(f"Showing {len(loans)} loan(s)")
-            for loan in loans:
-                lid     = getattr(loan, "loan_id", "N/A")
-                lamt    = getattr(loan, "principal_amount", 0)
-                lstatus = getattr(loan, "status", "")
-                if hasattr(lstatus, "value"):
-                    lstatus = lstatus.value
-                lemi    = getattr(loan, "emi_amount", 0)
-                ltenure = getattr(loan, "tenure_months", 0)
-                lrate   = getattr(loan, "interest_rate_annual", "N/A")
-
-                with st.expander(f"Loan #{lid} - {format_currency(lamt)} - {status_badge(lstatus)}"):
-                    m1, m2, m3 = st.columns(3)
-                    m1.metric("Principal", format_currency(lamt))
-                    m2.metric("EMI", format_currency(lemi))
-                    m3.metric("Tenure", f"{ltenure} months")
-                    st.markdown(f"**Rate:** {lrate}% p.a. &nbsp;|&nbsp; **Status:** {status_badge(lstatus)}")
+            st.dataframe(_loan_table(loans, show_user=False), use_container_width=True, hide_index=True)
+            loan = _select_loan(loans, "inspect_my_loans")
+            if loan is not None:
+                with st.expander(f"Loan #{loan.loan_id}", expanded=True):
+                    _loan_details(loan)
 
 # -----------------------------------------------------------------------
 # TAB 3 - EMI Calculator
 # -----------------------------------------------------------------------
-with tab_calc:
+@st.fragment
+def _calc_fragment():
+    """Standalone EMI calculator."""
     st.subheader("EMI Calculator")
     st.markdown("Calculate your Equated Monthly Installment before applying.")
 
@@ -242,69 +278,78 @@ with tab_calc:
             key="calc_tenure"
         )
         # Rate: auto from slab, shown read-only
-        calc_rate = loan_svc.get_interest_rate_for_amount(to_decimal(calc_principal))
+        calc_rate = preview_rate(calc_principal)
         st.metric("Interest Rate (p.a.)", f"{calc_rate}%", help="Fixed by loan amount slab.")
 
     with ec2:
-        p = to_decimal(calc_principal)
-        n = int(calc_tenure)
-
-        emi           = loan_svc.calculate_emi(p, calc_rate, n)
-        total_payment = emi * n
-        total_interest = total_payment - p
+        emi, total_payment, total_interest = estimate_emi_totals(calc_principal, float(calc_rate), int(calc_tenure))
 
         st.markdown("<br><br>", unsafe_allow_html=True)
         st.metric("Monthly EMI",    format_currency(emi))
         st.metric("Total Payment",  format_currency(total_payment))
         st.metric("Total Interest", format_currency(total_interest))
 
+
+def _loan_decision(action, loan_id: int, toast: str):
+    """Approve/Reject callback: runs before the click's rerun, so the list redraws without st.rerun()."""
+    try:
+        action(loan_id, _uid)
+    except Exception as e:
+        st.session_state["loan_decision_error"] = f"{e}"
+        return
+    invalidate_loans()
+    st.toast(toast)
+
+
 # -----------------------------------------------------------------------
 # TAB 4 - Loan Approvals (Admin only)
 # -----------------------------------------------------------------------
-if is_admin() and tab_approval:
-    with tab_approval:
-        st.subheader("Pending Loan Approvals")
+@st.fragment
+def _approvals_fragment():
+    """Pending loan applications with approve/reject actions (admin only)."""
+    st.subheader("Pending Loan Approvals")
 
-        if st.button("Refresh Pending", key="refresh_pending_loans"):
-            st.session_state.pop("pending_loans", None)
+    err = st.session_state.pop("loan_decision_error", None)
+    if err:
+        st.error(err)
 
-        if "pending_loans" not in st.session_state:
-            try:
-                pending = loan_svc.loan_repo.get_pending_approvals()
-                st.session_state["pending_loans"] = pending
-            except Exception as e:
-                st.error(f"{e}")
+    if st.button("Refresh Pending" if st.session_state.get("pending_loans_open") else "Load Pending",
+                 key="refresh_pending_loans"):
+        st.session_state["pending_loans_open"] = True
+        load_pending_loans.clear()
 
-        pending = st.session_state.get("pending_loans", [])
-        if not pending:
-            st.info("No pending loan applications.")
-        else:
-            for loan in pending:
-                lid   = getattr(loan, "loan_id", "N/A")
-                lamt  = getattr(loan, "principal_amount", 0)
-                luser = getattr(loan, "user_id", "N/A")
-
-                with st.expander(f"Loan #{lid} - User {luser} - {format_currency(lamt)}"):
-                    st.markdown(f"**EMI:** {format_currency(getattr(loan, 'emi_amount', 0))}")
-                    st.markdown(f"**Tenure:** {getattr(loan, 'tenure_months', 0)} months")
-                    st.markdown(f"**Rate:** {getattr(loan, 'interest_rate_annual', 'N/A')}% p.a.")
-
-                    ap1, ap2 = st.columns(2)
-                    with ap1:
-                        if st.button(f"Approve #{lid}", key=f"approve_{lid}"):
-                            try:
-                                loan_svc.approve_loan(lid, _uid)
-                                st.success(f"Loan #{lid} approved!")
-                                st.session_state.pop("pending_loans", None)
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"{e}")
-                    with ap2:
-                        if st.button(f"Reject #{lid}", key=f"reject_{lid}"):
-                            try:
-                                loan_svc.reject_loan(lid, _uid)
-                                st.success(f"Loan #{lid} rejected.")
-                                st.session_state.pop("pending_loans", None)
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"{e}")
+    if not st.session_state.get("pending_loans_open"):
+        st.info("Click Load Pending to fetch applications awaiting approval.")
+        return
+
+    try:
+        pending = load_pending_loans()
+    except Exception as e:
+        st.error(f"{e}")
+        pending = []
+    if not pending:
+        st.info("No pending loan applications.")
+    else:
+        st.dataframe(_loan_table(pending), use_container_width=True, hide_index=True)
+        loan = _select_loan(pending, "inspect_pending_loan")
+        if loan is not None:
+            lid = loan.loan_id
+            with st.expander(f"Loan #{lid} - User {loan.user_id} - {format_currency(loan.principal_amount)}", expanded=True):
+                _loan_details(loan)
+
+                ap1, ap2 = st.columns(2)
+                ap1.button(f"Approve #{lid}", key=f"approve_{lid}", on_click=_loan_decision,
+                           args=(loan_svc.approve_loan, lid, f"Loan #{lid} approved!"))
+                ap2.button(f"Reject #{lid}", key=f"reject_{lid}", on_click=_loan_decision,
+                           args=(loan_svc.reject_loan, lid, f"Loan #{lid} rejected."))
+
+
+with tab_apply:
+    _apply_fragment()
+with tab_active:
+    _loans_fragment()
+with tab_calc:
+    _calc_fragment()
+if tab_approval:
+    with tab_approval:
+        _approvals_fragment()
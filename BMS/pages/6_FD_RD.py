@@ -7,15 +7,20 @@ RBAC Rules:
   ADMIN    -> sees all FD/RD, can open for any user
 """
 
+import pandas as pd
 import streamlit as st
 from decimal import Decimal
 from datetime import date
+from operator import attrgetter
 
 from utils.auth_guard import require_role, get_current_user, is_admin
 from utils.sidebar import render_sidebar
 from utils.formatters import format_currency, format_date, status_badge, to_decimal
+from utils.services import (
+    get_investment_service, load_linked_account_options, load_all_deposits, load_user_deposits, invalidate_deposits
+)
 from core.services.investment_service import (
-    InvestmentService, ALLOWED_TENURES,
+    ALLOWED_TENURES,
     FD_INTEREST_SLABS, FD_DEFAULT_RATE,
     RD_INTEREST_SLABS, RD_DEFAULT_RATE,
 )
@@ -29,7 +34,53 @@ _uid = sd["user_id"]   # Always the session user - never from UI input for custo
 st.title("Fixed Deposits & Recurring Deposits")
 st.markdown("---")
 
-inv_svc = InvestmentService()
+inv_svc = get_investment_service()
+
+_TENURE_LABELS = {m: f"{m} months" for m in ALLOWED_TENURES}
+
+_FD_FIELDS = attrgetter(
+    "fd_id", "account_id", "status", "principal_amount", "interest_rate", "maturity_amount", "maturity_date"
+)
+_RD_FIELDS = attrgetter(
+    "rd_id", "account_id", "status", "installment_amount", "paid_installments",
+    "total_installments", "interest_rate", "next_due_date"
+)
+
+
+# Amounts, rates and dates stay raw in the deposit frames; the browser formats them
+_RUPEES = st.column_config.NumberColumn(format="₹%.2f")
+_DEPOSIT_COLUMNS = {
+    "Principal": _RUPEES,
+    "Maturity Amount": _RUPEES,
+    "Installment": _RUPEES,
+    "Rate (%)": st.column_config.NumberColumn(format="%.2f%%"),
+    "Maturity Date": st.column_config.DateColumn(format="DD MMM YYYY"),
+    "Next Due": st.column_config.DateColumn(format="DD MMM YYYY"),
+}
+
+
+def _fd_table(fds: list) -> pd.DataFrame:
+    """All FDs as one display frame (admin view)."""
+    df = pd.DataFrame(
+        map(_FD_FIELDS, fds),
+        columns=["FD ID", "Account", "Status", "Principal", "Rate (%)", "Maturity Amount", "Maturity Date"]
+    )
+    df["Status"] = df["Status"].map(lambda v: status_badge(str(v)))
+    df[["Principal", "Rate (%)", "Maturity Amount"]] = df[["Principal", "Rate (%)", "Maturity Amount"]].apply(pd.to_numeric)
+    return df
+
+
+def _rd_table(rds: list) -> pd.DataFrame:
+    """All RDs as one display frame (admin view)."""
+    df = pd.DataFrame(
+        map(_RD_FIELDS, rds),
+        columns=["RD ID", "Account", "Status", "Installment", "Paid", "Total", "Rate (%)", "Next Due"]
+    )
+    df["Status"] = df["Status"].map(lambda v: status_badge(str(v)))
+    df[["Installment", "Rate (%)"]] = df[["Installment", "Rate (%)"]].apply(pd.to_numeric)
+    df["Progress"] = df.pop("Paid").astype(str) + "/" + df.pop("Total").astype(str)
+    return df
+
 
 tab_fd, tab_rd, tab_active, tab_calc = st.tabs([
     "Open FD", "Open RD",
@@ -40,7 +91,9 @@ tab_fd, tab_rd, tab_active, tab_calc = st.tabs([
 # -----------------------------------------------------------------------
 # TAB 1 - Open Fixed Deposit
 # -----------------------------------------------------------------------
-with tab_fd:
+@st.fragment
+def _open_fd_fragment():
+    """Open-FD form; the target-user input reruns only this tab."""
     st.subheader("Open Fixed Deposit")
 
     # Determine target user
@@ -55,10 +108,9 @@ with tab_fd:
 
     # Fetch linked accounts
     try:
-        from core.services.account_service import AccountService
-        fd_accounts = AccountService().get_customer_accounts(int(target_uid_fd))
+        fd_acc_opts = load_linked_account_options(int(target_uid_fd))
     except Exception:
-        fd_accounts = []
+        fd_acc_opts = {}
 
     with st.form("open_fd_form"):
         fd_col1, fd_col2 = st.columns(2)
@@ -74,12 +126,8 @@ with tab_fd:
 
         with fd_col2:
             # Account selector
-            if fd_accounts:
-                fd_acc_opts = {
-                    f"#{a['account_id']} - {a['account_number']} ({a['account_type'].title()})": a["account_id"]
-                    for a in fd_accounts
-                }
-                fd_acc_label = st.selectbox("Linked Account", list(fd_acc_opts.keys()), key="fd_acc_sel")
+            if fd_acc_opts:
+                fd_acc_label = st.selectbox("Linked Account", list(fd_acc_opts), key="fd_acc_sel")
                 fd_account_id = fd_acc_opts[fd_acc_label]
             elif is_admin():
                 fd_account_id = st.number_input("Linked Account ID", min_value=1, step=1, key="fd_acc_id_admin")
@@ -90,7 +138,7 @@ with tab_fd:
             # Tenure: predefined selectbox only
             fd_tenure = st.selectbox(
                 "Tenure", ALLOWED_TENURES,
-                format_func=lambda m: f"{m} months",
+                format_func=_TENURE_LABELS.__getitem__,
                 key="fd_tenure"
             )
 
@@ -123,16 +171,20 @@ with tab_fd:
                     payout_mode=fd_payout,
                     created_by=_uid,
                 )
+                invalidate_deposits()
                 maturity = inv_svc.calculate_fd_maturity(to_decimal(fd_amount), fd_auto_rate, int(fd_tenure))
                 st.success(f"FD opened! FD ID: **{fd_id}**")
                 st.metric("Maturity Amount", format_currency(maturity))
             except Exception as e:
                 st.error(f"{e}")
 
+
 # -----------------------------------------------------------------------
 # TAB 2 - Open Recurring Deposit
 # -----------------------------------------------------------------------
-with tab_rd:
+@st.fragment
+def _open_rd_fragment():
+    """Open-RD form; the target-user input reruns only this tab."""
     st.subheader("Open Recurring Deposit")
 
     # Determine target user
@@ -147,10 +199,9 @@ with tab_rd:
 
     # Fetch linked accounts
     try:
-        from core.services.account_service import AccountService
-        rd_accounts = AccountService().get_customer_accounts(int(target_uid_rd))
+        rd_acc_opts = load_linked_account_options(int(target_uid_rd))
     except Exception:
-        rd_accounts = []
+        rd_acc_opts = {}
 
     with st.form("open_rd_form"):
         rd_col1, rd_col2 = st.columns(2)
@@ -163,18 +214,14 @@ with tab_rd:
             # Tenure: predefined selectbox only
             rd_tenure = st.selectbox(
                 "Tenure", ALLOWED_TENURES,
-                format_func=lambda m: f"{m} months",
+                format_func=_TENURE_LABELS.__getitem__,
                 key="rd_tenure"
             )
 
         with rd_col2:
             # Account selector
-            if rd_accounts:
-                rd_acc_opts = {
-                    f"#{a['account_id']} - {a['account_number']} ({a['account_type'].title()})": a["account_id"]
-                    for a in rd_accounts
-                }
-                rd_acc_label = st.selectbox("Linked Account", list(rd_acc_opts.keys()), key="rd_acc_sel")
+            if rd_acc_opts:
+                rd_acc_label = st.selectbox("Linked Account", list(rd_acc_opts), key="rd_acc_sel")
                 rd_account_id = rd_acc_opts[rd_acc_label]
             elif is_admin():
                 rd_account_id = st.number_input("Linked Account ID", min_value=1, step=1, key="rd_acc_id_admin")
@@ -211,63 +258,44 @@ with tab_rd:
                     installment=to_decimal(rd_installment),
                     created_by=_uid,
                 )
+                invalidate_deposits()
                 st.success(f"RD opened! RD ID: **{rd_id}**")
             except Exception as e:
                 st.error(f"{e}")
 
+
 # -----------------------------------------------------------------------
 # TAB 3 - View Deposits
 # -----------------------------------------------------------------------
-with tab_active:
+@st.fragment
+def _deposits_fragment():
+    """All deposits (admin) or the customer's own deposits."""
     if is_admin():
         st.subheader("All Deposits in System")
         _, col_btn = st.columns([4, 1])
         with col_btn:
             if st.button("Refresh", key="refresh_all_deps"):
-                st.session_state.pop("all_fds_cache", None)
-                st.session_state.pop("all_rds_cache", None)
+                load_all_deposits.clear()
 
-        if "all_fds_cache" not in st.session_state:
-            try:
-                st.session_state["all_fds_cache"] = inv_svc.get_all_fds()
-                st.session_state["all_rds_cache"] = inv_svc.get_all_rds()
-            except Exception as e:
-                st.error(f"{e}")
-                st.session_state["all_fds_cache"] = []
-                st.session_state["all_rds_cache"] = []
-
-        all_fds = st.session_state.get("all_fds_cache", [])
-        all_rds = st.session_state.get("all_rds_cache", [])
+        try:
+            all_fds, all_rds = load_all_deposits()
+        except Exception as e:
+            st.error(f"{e}")
+            all_fds, all_rds = [], []
 
         if all_fds:
             st.markdown("#### Fixed Deposits")
             st.caption(f"{len(all_fds)} FD(s)")
-            for fd in all_fds:
-                fid     = getattr(fd, "fd_id", "N/A")
-                fstatus = str(getattr(fd, "status", "active"))
-                facc    = getattr(fd, "account_id", "N/A")
-                with st.expander(f"FD #{fid} - Account #{facc} - {status_badge(fstatus)}"):
-                    c1, c2, c3 = st.columns(3)
-                    c1.metric("Principal",  format_currency(getattr(fd, "principal_amount", 0)))
-                    c2.metric("Rate",       f"{getattr(fd, 'interest_rate', 'N/A')}%")
-                    c3.metric("Maturity",   format_currency(getattr(fd, "maturity_amount", 0)))
-                    st.markdown(f"**Maturity Date:** {format_date(getattr(fd, 'maturity_date', None))}")
+            st.dataframe(_fd_table(all_fds), use_container_width=True, hide_index=True,
+                         column_config=_DEPOSIT_COLUMNS)
         else:
             st.info("No FDs in the system.")
 
         if all_rds:
             st.markdown("#### Recurring Deposits")
             st.caption(f"{len(all_rds)} RD(s)")
-            for rd in all_rds:
-                rid     = getattr(rd, "rd_id", "N/A")
-                rstatus = str(getattr(rd, "status", "active"))
-                racc    = getattr(rd, "account_id", "N/A")
-                with st.expander(f"RD #{rid} - Account #{racc} - {status_badge(rstatus)}"):
-                    r1, r2, r3 = st.columns(3)
-                    r1.metric("Installment", format_currency(getattr(rd, "installment_amount", 0)))
-                    r2.metric("Progress",    f"{getattr(rd, 'paid_installments', 0)}/{getattr(rd, 'total_installments', 0)}")
-                    r3.metric("Rate",        f"{getattr(rd, 'interest_rate', 'N/A')}%")
-                    st.markdown(f"**Next Due:** {format_date(getattr(rd, 'next_due_date', None))}")
+            st.dataframe(_rd_table(all_rds), use_container_width=True, hide_index=True,
+                         column_config=_DEPOSIT_COLUMNS)
         else:
             st.info("No RDs in the system.")
 
@@ -277,53 +305,47 @@ with tab_active:
         _, col_btn = st.columns([4, 1])
         with col_btn:
             if st.button("Refresh", key="refresh_my_deps"):
-                st.session_state.pop("my_fds_cache", None)
-                st.session_state.pop("my_rds_cache", None)
-
-        if "my_fds_cache" not in st.session_state:
-            try:
-                st.session_state["my_fds_cache"] = inv_svc.get_fds_for_user(_uid)
-                st.session_state["my_rds_cache"] = inv_svc.get_rds_for_user(_uid)
-            except Exception as e:
-                st.error(f"{e}")
-                st.session_state["my_fds_cache"] = []
-                st.session_state["my_rds_cache"] = []
+                load_user_deposits.clear()
 
-        my_fds = st.session_state.get("my_fds_cache", [])
-        my_rds = st.session_state.get("my_rds_cache", [])
+        try:
+            my_fds, my_rds = load_user_deposits(_uid)
+        except Exception as e:
+            st.error(f"{e}")
+            my_fds, my_rds = [], []
 
         if my_fds:
             st.markdown("#### My Fixed Deposits")
             for fd in my_fds:
-                fid     = getattr(fd, "fd_id", "N/A")
-                fstatus = str(getattr(fd, "status", "active"))
-                with st.expander(f"FD #{fid} - {status_badge(fstatus)}"):
+                fid, _, fstatus, fprinc, frate, fmat, fmatd = _FD_FIELDS(fd)
+                with st.expander(f"FD #{fid} - {status_badge(str(fstatus))}"):
                     c1, c2, c3 = st.columns(3)
-                    c1.metric("Principal",  format_currency(getattr(fd, "principal_amount", 0)))
-                    c2.metric("Rate",       f"{getattr(fd, 'interest_rate', 'N/A')}%")
-                    c3.metric("Maturity",   format_currency(getattr(fd, "maturity_amount", 0)))
-                    st.markdown(f"**Maturity Date:** {format_date(getattr(fd, 'maturity_date', None))}")
+                    c1.metric("Principal",  format_currency(fprinc))
+                    c2.metric("Rate",       f"{frate}%")
+                    c3.metric("Maturity",   format_currency(fmat or 0))
+                    st.markdown(f"**Maturity Date:** {format_date(fmatd)}")
         else:
             st.info("No Fixed Deposits on record.")
 
         if my_rds:
             st.markdown("#### My Recurring Deposits")
             for rd in my_rds:
-                rid     = getattr(rd, "rd_id", "N/A")
-                rstatus = str(getattr(rd, "status", "active"))
-                with st.expander(f"RD #{rid} - {status_badge(rstatus)}"):
+                rid, _, rstatus, rinst, rpaid, rtotal, rrate, rdue = _RD_FIELDS(rd)
+                with st.expander(f"RD #{rid} - {status_badge(str(rstatus))}"):
                     r1, r2, r3 = st.columns(3)
-                    r1.metric("Installment", format_currency(getattr(rd, "installment_amount", 0)))
-                    r2.metric("Progress",    f"{getattr(rd, 'paid_installments', 0)}/{getattr(rd, 'total_installments', 0)}")
-                    r3.metric("Rate",        f"{getattr(rd, 'interest_rate', 'N/A')}%")
-                    st.markdown(f"**Next Due:** {format_date(getattr(rd, 'next_due_date', None))}")
+                    r1.metric("Installment", format_currency(rinst))
+                    r2.metric("Progress",    f"{rpaid}/{rtotal}")
+                    r3.metric("Rate",        f"{rrate}%")
+                    st.markdown(f"**Next Due:** {format_date(rdue)}")
         else:
             st.info("No Recurring Deposits on record.")
 
+
 # -----------------------------------------------------------------------
 # TAB 4 - Interest Calculator
 # -----------------------------------------------------------------------
-with tab_calc:
+@st.fragment
+def _calc_fragment():
+    """Standalone FD/RD interest calculator."""
     st.subheader("Deposit Interest Calculator")
 
     calc_type = st.radio(
@@ -341,7 +363,7 @@ with tab_calc:
             # Tenure: predefined selectbox only
             fd_t = st.selectbox(
                 "Tenure", ALLOWED_TENURES,
-                format_func=lambda m: f"{m} months",
+                format_func=_TENURE_LABELS.__getitem__,
                 key="calc_fd_t"
             )
             # Rate: auto from slab, read-only
@@ -365,7 +387,7 @@ with tab_calc:
             # Tenure: predefined selectbox only
             rd_t = st.selectbox(
                 "Tenure", ALLOWED_TENURES,
-                format_func=lambda m: f"{m} months",
+                format_func=_TENURE_LABELS.__getitem__,
                 key="calc_rd_t"
             )
             # Rate: auto from slab, read-only
@@ -380,3 +402,13 @@ with tab_calc:
             st.metric("Maturity Amount",  format_currency(rd_maturity))
             st.metric("Interest Earned",  format_currency(rd_interest))
             st.metric("Total Deposited",  format_currency(rd_total_deposit))
+
+
+with tab_fd:
+    _open_fd_fragment()
+with tab_rd:
+    _open_rd_fragment()
+with tab_active:
+    _deposits_fragment()
+with tab_calc:
+    _calc_fragment()
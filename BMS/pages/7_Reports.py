@@ -3,13 +3,17 @@ Reports Page - Transaction summaries, account statistics, and exports.
 Roles: admin
 """
 
+import io
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 
 from utils.auth_guard import require_role, get_current_user
 from utils.sidebar import render_sidebar
 from utils.formatters import format_currency, format_date
+from utils.services import get_txn_service, load_low_balance_accounts
 
 require_role(["admin"])
 render_sidebar()
@@ -38,9 +42,7 @@ with tab_txn:
 
     if st.button("Generate Report", key="gen_txn_rpt"):
         try:
-            from core.services.transaction_service import TransactionService
-
-            svc = TransactionService()
+            svc = get_txn_service()
             summary = svc.get_transaction_summary(int(rpt_acc_id), days=int(rpt_days), performed_by=sd["user_id"])
 
             if summary:
@@ -58,20 +60,19 @@ with tab_txn:
             else:
                 st.info("No transaction data for the selected period.")
 
-            # Also get full history for chart
-            history = svc.get_transaction_history(int(rpt_acc_id), performed_by=sd["user_id"], limit=100)
-            if history and isinstance(history, list) and len(history) > 0:
-                if isinstance(history[0], dict):
-                    df = pd.DataFrame(history)
-                else:
-                    df = pd.DataFrame([vars(t) for t in history])
-
-                if "amount" in df.columns and "txn_type" in df.columns:
-                    st.markdown("#### Transaction Distribution")
-                    type_summary = df.groupby("txn_type")["amount"].sum()
-                    st.bar_chart(type_summary)
+            # Per-type totals are aggregated in SQL for the chart
+            type_summary = svc.get_txn_type_summary(int(rpt_acc_id), days=int(rpt_days), performed_by=sd["user_id"])
+            if type_summary:
+                st.markdown("#### Transaction Distribution")
+                st.bar_chart(pd.Series({k: float(v) for k, v in type_summary.items()}, name="amount"))
 
-                csv = df.to_csv(index=False)
+            # Full history for the CSV export
+            history = svc.get_transaction_history(int(rpt_acc_id), performed_by=sd["user_id"], limit=100)
+            if history:
+                # get_transaction_history returns uniform dicts; Arrow's C++ writer encodes them directly
+                buf = io.BytesIO()
+                pacsv.write_csv(pa.Table.from_pylist(history), buf)
+                csv = buf.getvalue()
                 st.download_button("Download Full Report (CSV)", csv, file_name="transaction_report.csv", mime="text/csv")
 
         except Exception as e:
@@ -85,10 +86,8 @@ with tab_acct:
 
     if st.button("Load Statistics", key="load_acct_stats"):
         try:
-            from core.services.account_service import AccountService
-
-            svc = AccountService()
-            low_bal = svc.get_low_balance_accounts() or []
+            load_low_balance_accounts.clear()
+            low_bal = load_low_balance_accounts() or []
 
             st.metric("Low Balance Accounts", len(low_bal))
 
@@ -119,10 +118,7 @@ with tab_alerts:
     st.subheader("System Alerts")
 
     try:
-        from core.services.account_service import AccountService
-
-        svc = AccountService()
-        low_bal = svc.get_low_balance_accounts() or []
+        low_bal = load_low_balance_accounts() or []
 
         if low_bal:
             st.warning(f"**{len(low_bal)} account(s)** are below minimum balance requirement.")
@@ -3,11 +3,20 @@ Authentication guard utilities for Streamlit pages.
 Provides login-required and role-based access control.
 """
 
+import os
+import time
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+
+from utils.services import get_auth_service
 
 
 SESSION_TIMEOUT_MINUTES = 30
+SESSION_TIMEOUT_SECONDS = SESSION_TIMEOUT_MINUTES * 60
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXY_HOPS = max(1, int(os.getenv("TRUSTED_PROXY_HOPS", 1)))
 
 
 def require_login():
@@ -18,11 +27,15 @@ def require_login():
     _check_session_timeout()
 
 
+@lru_cache(maxsize=16)
+def _role_set(allowed_roles: tuple) -> frozenset:
+    return frozenset(role.lower() for role in allowed_roles)
+
+
 def require_role(allowed_roles: list):
     """Stop page execution if user role is not in allowed_roles."""
     require_login()
-    user_role = get_user_role()
-    if any(role.lower() == user_role for role in allowed_roles):
+    if get_user_role() in _role_set(tuple(allowed_roles)):
         return
     st.error("You do not have permission to access this page.")
     st.stop()
@@ -39,6 +52,20 @@ def get_user_role() -> str:
     return role.lower() if isinstance(role, str) else str(role).lower()
 
 
+def get_client_ip() -> str:
+    """Best-effort client IP from proxy headers, or None when unavailable."""
+    try:
+        headers = st.context.headers
+    except Exception:
+        return None
+    forwarded = headers.get("X-Forwarded-For")
+    if forwarded:
+        # Clients can prepend anything; only the entries appended by our own proxies are trusted
+        hops = [part.strip() for part in forwarded.split(",")]
+        return hops[-min(TRUSTED_PROXY_HOPS, len(hops))] or None
+    return headers.get("X-Real-Ip")
+
+
 def is_logged_in() -> bool:
     """Check whether a user session exists."""
     return "session_data" in st.session_state
@@ -46,22 +73,14 @@ def is_logged_in() -> bool:
 
 def handle_logout():
     """Logout the current user and rerun."""
-    from core.services.authentication_service import AuthenticationService
-
-    auth = AuthenticationService()
     token = st.session_state.get("session_data", {}).get("session_token")
     if token:
         try:
-            auth.logout(token)
+            get_auth_service().logout(token)
         except Exception:
             pass
-    if "session_data" in st.session_state:
-        del st.session_state["session_data"]
-    
     # Ensure all auth-related state is cleared
-    for key in list(st.session_state.keys()):
-        del st.session_state[key]
-            
+    st.session_state.clear()
     st.rerun()
 
 
@@ -70,10 +89,13 @@ def _check_session_timeout():
     sd = st.session_state.get("session_data")
     if not sd:
         return
-    last_activity = sd.get("last_activity")
-    if last_activity and datetime.now() - last_activity > timedelta(minutes=SESSION_TIMEOUT_MINUTES):
+    # Idle time is measured on the monotonic clock; last_activity stays a datetime for display
+    now = time.monotonic()
+    last_seen = sd.get("last_activity_mono")
+    if last_seen is not None and now - last_seen > SESSION_TIMEOUT_SECONDS:
         handle_logout()
     else:
+        sd["last_activity_mono"] = now
         sd["last_activity"] = datetime.now()
 
 
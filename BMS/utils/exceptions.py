@@ -51,8 +51,18 @@ class LoanNotFoundException(BankingSystemException):
 
 class InvalidOTPException(BankingSystemException):
     """Raised when OTP is invalid or expired"""
-    pass
+    def __init__(self, message: str, remaining_attempts: int = None, locked: bool = False,
+                 error_code: str = None):
+        self.remaining_attempts = remaining_attempts
+        self.locked = locked
+        super().__init__(message, error_code)
 
 class PlanNotFoundException(BankingSystemException):
     """Raised when deposit/loan plan not found"""
-    pass
\ No newline at end of file
+    pass
+
+class RateLimitException(BankingSystemException):
+    """Raised when an operation is attempted too often"""
+    def __init__(self, message: str, retry_after: int = 0, error_code: str = None):
+        self.retry_after = retry_after
+        super().__init__(message, error_code)
\ No newline at end of file
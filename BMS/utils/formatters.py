@@ -5,21 +5,32 @@ Currency formatting, status badges, date helpers.
 
 from decimal import Decimal
 from datetime import datetime, date
+from functools import lru_cache
 from typing import Union
 
+from utils.helpers import format_indian_amount
+
 
 def format_currency(amount: Union[int, float, Decimal, str]) -> str:
     """Format amount as Indian Rupee currency string."""
+    # Decimals and ints format exactly as they are; floats and strings go through
+    # the cached Decimal(str(...)) path so binary float noise never shows up.
+    if isinstance(amount, (Decimal, int)) and not isinstance(amount, bool):
+        return f"₹{format_indian_amount(amount)}"
+    if amount is None:
+        return "₹0.00"
+    return _format_currency(str(amount))
+
+
+@lru_cache(maxsize=4096)
+def _format_currency(amount: str) -> str:
     try:
-        if isinstance(amount, str):
-            amount = Decimal(amount)
-        elif isinstance(amount, (int, float)):
-            amount = Decimal(str(amount))
-        return f"₹{amount:,.2f}"
+        return f"₹{format_indian_amount(Decimal(amount))}"
     except Exception:
         return f"₹{amount}"
 
 
+@lru_cache(maxsize=4096)
 def format_date(dt: Union[datetime, date, None]) -> str:
     """Format date for display."""
     if dt is None:
@@ -29,23 +40,39 @@ def format_date(dt: Union[datetime, date, None]) -> str:
     return dt.strftime("%d %b %Y")
 
 
+_STATUS_BADGES = {
+    "active": "Active",
+    "frozen": "Frozen",
+    "closed": "Closed",
+    "pending_approval": "Pending Approval",
+    "approved": "Approved",
+    "rejected": "Rejected",
+    "defaulted": "Defaulted",
+    "sent": "Sent",
+    "queued": "Queued",
+    "failed": "Failed",
+}
+
+
+@lru_cache(maxsize=256)
 def status_badge(status: str) -> str:
     """Return an emoji + text badge for account/loan status values."""
-    badges = {
-        "active": "Active",
-        "frozen": "Frozen",
-        "closed": "Closed",
-        "pending_approval": "Pending Approval",
-        "approved": "Approved",
-        "rejected": "Rejected",
-        "defaulted": "Defaulted",
-        "sent": "Sent",
-        "queued": "Queued",
-        "failed": "Failed",
-    }
-    return badges.get(status, status.replace("_", " ").title())
+    return _STATUS_BADGES.get(status, status.replace("_", " ").title())
+
+
+@lru_cache(maxsize=1024)
+def mask_phone(phone: str) -> str:
+    """Mask the middle of a phone number for display, e.g. 98XXXX3210."""
+    if phone and len(phone) >= 4:
+        return phone[:2] + "XXXX" + phone[-4:]
+    return phone or ""
 
 
 def to_decimal(value: Union[float, int, str]) -> Decimal:
     """Safely convert a Streamlit number_input value to Decimal."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    # Floats go through str() so binary artifacts (0.1 -> 0.1000000000000000055...) never leak in
     return Decimal(str(value))
@@ -3,15 +3,65 @@ Helper Utilities
 Common utility functions for banking operations
 """
 
-import uuid
+import string
+import secrets
+import calendar
 import hashlib
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any
 import logging
+from dateutil.relativedelta import relativedelta
 
 logger = logging.getLogger(__name__)
 
+_ONE_DAY = timedelta(days=1)
+
+# Prebuilt '*' runs for masking account and phone numbers of typical lengths
+_MASKS = tuple('*' * n for n in range(32))
+
+# Password character classes, as bits, so one pass over the password finds all of them
+PW_UPPER, PW_LOWER, PW_DIGIT, PW_SPECIAL = 1, 2, 4, 8
+PW_SPECIAL_CHARS = '!@#$%^&*(),.?":{}|<>'
+_PW_CHAR_CLASS = {
+    **dict.fromkeys(string.ascii_uppercase, PW_UPPER),
+    **dict.fromkeys(string.ascii_lowercase, PW_LOWER),
+    **dict.fromkeys(string.digits, PW_DIGIT),
+    **dict.fromkeys(PW_SPECIAL_CHARS, PW_SPECIAL),
+}
+_PW_ALL_CLASSES = PW_UPPER | PW_LOWER | PW_DIGIT | PW_SPECIAL
+_COMMON_PWS = frozenset(('password', '12345678', 'qwerty123'))
+
+
+def format_indian_amount(amount) -> str:
+    """Two-place amount with Indian digit grouping: last three digits, then pairs (12,34,567.89)"""
+    amount_str = f"{amount:.2f}"
+    sign = ""
+    if amount_str[0] == "-":
+        sign, amount_str = "-", amount_str[1:]
+    
+    integer, fraction = amount_str[:-3], amount_str[-3:]
+    if len(integer) > 3:
+        head, tail = integer[:-3], integer[-3:]
+        first = len(head) % 2
+        groups = [head[:first]] if first else []
+        groups.extend(head[i:i + 2] for i in range(first, len(head), 2))
+        groups.append(tail)
+        integer = ",".join(groups)
+    
+    return f"{sign}{integer}{fraction}"
+
+
+def _compound_amount(principal: float, annual_rate: float, years: float, frequency: int) -> float:
+    """A = P(1 + r/n)^(nt) in float; callers round the result as currency"""
+    return principal * (1.0 + annual_rate / (100.0 * frequency)) ** (frequency * years)
+
+
+def _emi_amount(principal: float, monthly_rate: float, months: int) -> float:
+    """EMI = P * r * (1+r)^n / ((1+r)^n - 1) in float, for a non-zero monthly rate"""
+    power_term = (1.0 + monthly_rate) ** months
+    return principal * monthly_rate * power_term / (power_term - 1.0)
+
 class NumberUtils:
     """Utility functions for number operations"""
     
@@ -30,14 +80,9 @@ class NumberUtils:
     def calculate_compound_interest(principal: Decimal, rate: Decimal, 
                                   time_years: Decimal, compound_frequency: int = 1) -> Decimal:
         """Calculate compound interest"""
-        # A = P(1 + r/n)^(nt)
-        rate_decimal = rate / 100
-        compound_rate = Decimal(1) + (rate_decimal / compound_frequency)
-        exponent = compound_frequency * time_years
-        
-        # Convert to float for power operation, then back to Decimal
-        amount = Decimal(str(float(principal) * (float(compound_rate) ** float(exponent))))
-        return NumberUtils.round_currency(amount)
+        # Power in float, then a single conversion back to Decimal for rounding
+        amount = _compound_amount(float(principal), float(rate), float(time_years), compound_frequency)
+        return NumberUtils.round_currency(Decimal(repr(amount)))
     
     @staticmethod
     def calculate_simple_interest(principal: Decimal, rate: Decimal, time_years: Decimal) -> Decimal:
@@ -52,13 +97,10 @@ class NumberUtils:
         if annual_rate == 0:
             return NumberUtils.round_currency(principal / tenure_months)
         
-        monthly_rate = annual_rate / (12 * 100)  # Convert to monthly decimal rate
-        
-        # EMI = P * r * (1+r)^n / ((1+r)^n - 1)
-        power_term = (1 + monthly_rate) ** tenure_months
-        emi = principal * monthly_rate * power_term / (power_term - 1)
+        monthly_rate = float(annual_rate) / 1200.0  # Convert to monthly decimal rate
+        emi = _emi_amount(float(principal), monthly_rate, int(tenure_months))
         
-        return NumberUtils.round_currency(emi)
+        return NumberUtils.round_currency(Decimal(repr(emi)))
 
 class DateUtils:
     """Utility functions for date operations"""
@@ -66,14 +108,15 @@ class DateUtils:
     @staticmethod
     def add_months(start_date: date, months: int) -> date:
         """Add months to a date"""
-        from dateutil.relativedelta import relativedelta
         return start_date + relativedelta(months=months)
     
     @staticmethod
     def add_years(start_date: date, years: int) -> date:
         """Add years to a date"""
-        from dateutil.relativedelta import relativedelta
-        return start_date + relativedelta(years=years)
+        year = start_date.year + years
+        # Feb 29 clamps to Feb 28 in non-leap years, as relativedelta does
+        day = min(start_date.day, calendar.monthrange(year, start_date.month)[1])
+        return start_date.replace(year=year, day=day)
     
     @staticmethod
     def get_age(birth_date: date, reference_date: date = None) -> int:
@@ -81,24 +124,23 @@ class DateUtils:
         if reference_date is None:
             reference_date = date.today()
         
-        age = reference_date.year - birth_date.year
-        if (reference_date.month, reference_date.day) < (birth_date.month, birth_date.day):
-            age -= 1
-        
-        return age
+        # Month/day packed as MMDD so "birthday not reached yet" is one int compare
+        before_birthday = (reference_date.month * 100 + reference_date.day
+                           < birth_date.month * 100 + birth_date.day)
+        return reference_date.year - birth_date.year - before_birthday
     
     @staticmethod
     def get_business_days_between(start_date: date, end_date: date) -> int:
         """Calculate business days between two dates (excluding weekends)"""
-        current_date = start_date
-        business_days = 0
-        
-        while current_date <= end_date:
-            if current_date.weekday() < 5:  # Monday = 0, Sunday = 6
-                business_days += 1
-            current_date += timedelta(days=1)
+        total_days = (end_date - start_date).days + 1
+        if total_days <= 0:
+            return 0
         
-        return business_days
+        # Every full week has 5 business days; count the leftover days individually
+        full_weeks, remainder = divmod(total_days, 7)
+        first_weekday = start_date.weekday()  # Monday = 0, Sunday = 6
+        extra = sum(1 for i in range(remainder) if (first_weekday + i) % 7 < 5)
+        return full_weeks * 5 + extra
     
     @staticmethod
     def is_business_day(check_date: date) -> bool:
@@ -108,17 +150,17 @@ class DateUtils:
     @staticmethod
     def get_next_business_day(start_date: date) -> date:
         """Get next business day"""
-        next_date = start_date + timedelta(days=1)
-        while not DateUtils.is_business_day(next_date):
-            next_date += timedelta(days=1)
-        return next_date
+        # Friday, Saturday and Sunday all roll forward to Monday
+        weekday = start_date.weekday()
+        offset = 1 if weekday < 4 else 7 - weekday
+        return start_date + timedelta(days=offset)
     
     @staticmethod
     def get_month_end(check_date: date) -> date:
         """Get last day of the month"""
-        from dateutil.relativedelta import relativedelta
-        next_month = check_date.replace(day=1) + relativedelta(months=1)
-        return next_month - timedelta(days=1)
+        if check_date.month == 12:
+            return check_date.replace(day=31)
+        return check_date.replace(month=check_date.month + 1, day=1) - _ONE_DAY
 
 class StringUtils:
     """Utility functions for string operations"""
@@ -127,39 +169,39 @@ class StringUtils:
     def generate_reference_number(prefix: str = "TXN") -> str:
         """Generate unique reference number"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())[:8].upper()
+        unique_id = secrets.token_hex(4).upper()
         return f"{prefix}{timestamp}{unique_id}"
     
     @staticmethod
     def generate_account_number(prefix: str = "ACC") -> str:
         """Generate unique account number"""
         timestamp = datetime.now().strftime("%Y%m%d")
-        unique_id = str(uuid.uuid4())[:6].upper()
+        unique_id = secrets.token_hex(3).upper()
         return f"{prefix}{timestamp}{unique_id}"
     
     @staticmethod
     def mask_account_number(account_number: str) -> str:
         """Mask account number for display (show only last 4 digits)"""
-        if len(account_number) <= 4:
+        n = len(account_number) - 4
+        if n <= 0:
             return account_number
         
-        masked_part = "*" * (len(account_number) - 4)
+        masked_part = _MASKS[n] if n < 32 else "*" * n
         return masked_part + account_number[-4:]
     
     @staticmethod
     def mask_phone_number(phone: str) -> str:
         """Mask phone number for display"""
-        if len(phone) <= 4:
+        n = len(phone) - 4
+        if n <= 0:
             return phone
         
-        return phone[:2] + "*" * (len(phone) - 4) + phone[-2:]
+        return phone[:2] + (_MASKS[n] if n < 32 else "*" * n) + phone[-2:]
     
     @staticmethod
     def format_currency(amount: Decimal, currency_symbol: str = "₹") -> str:
         """Format amount as currency string"""
-        # Indian number format with commas
-        amount_str = f"{amount:,.2f}"
-        return f"{currency_symbol}{amount_str}"
+        return f"{currency_symbol}{format_indian_amount(amount)}"
     
     @staticmethod
     def clean_string(text: str) -> str:
@@ -182,18 +224,29 @@ class SecurityUtils:
     @staticmethod
     def generate_session_token() -> str:
         """Generate secure session token"""
-        return str(uuid.uuid4())
+        return secrets.token_urlsafe(32)
+    
+    @staticmethod
+    def password_char_classes(password: str) -> int:
+        """Bitmask of the PW_* character classes present in password (ASCII classes)"""
+        mask = 0
+        for c in password:
+            mask |= _PW_CHAR_CLASS.get(c, 0)
+            if mask == _PW_ALL_CLASSES:
+                break
+        return mask
     
     @staticmethod
     def is_strong_password(password: str) -> Dict[str, Any]:
         """Check password strength and return detailed analysis"""
+        mask = SecurityUtils.password_char_classes(password)
         checks = {
             'length': len(password) >= 8,
-            'uppercase': any(c.isupper() for c in password),
-            'lowercase': any(c.islower() for c in password),
-            'digit': any(c.isdigit() for c in password),
-            'special': any(c in "!@#$%^&*(),.?\":{}|<>" for c in password),
-            'no_common': password.lower() not in ['password', '12345678', 'qwerty123']
+            'uppercase': bool(mask & PW_UPPER),
+            'lowercase': bool(mask & PW_LOWER),
+            'digit': bool(mask & PW_DIGIT),
+            'special': bool(mask & PW_SPECIAL),
+            'no_common': password.lower() not in _COMMON_PWS
         }
         
         strength_score = sum(checks.values())
@@ -233,18 +286,20 @@ class SecurityUtils:
         return suggestions
 
 class LoggingUtils:
-    """Logging utility functions"""
+    """Logging utility functions (records carry their own creation time)"""
     
     @staticmethod
     def log_transaction(transaction_type: str, account_id: int, amount: Decimal, 
                        user_id: int = None, details: Dict[str, Any] = None):
         """Log transaction for audit trail"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         log_data = {
             'transaction_type': transaction_type,
             'account_id': account_id,
             'amount': str(amount),
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
@@ -254,11 +309,13 @@ class LoggingUtils:
     def log_security_event(event_type: str, user_id: int = None, 
                           ip_address: str = None, details: Dict[str, Any] = None):
         """Log security events"""
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        
         log_data = {
             'event_type': event_type,
             'user_id': user_id,
             'ip_address': ip_address,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
@@ -268,12 +325,14 @@ class LoggingUtils:
     def log_business_event(event_type: str, entity_type: str, entity_id: int,
                           user_id: int = None, details: Dict[str, Any] = None):
         """Log business events"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         log_data = {
             'event_type': event_type,
             'entity_type': entity_type,
             'entity_id': entity_id,
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
@@ -0,0 +1,63 @@
+"""
+In-process sliding-window rate limiter.
+Used to throttle OTP generation and verification per user and per client IP.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Hashable, List, Tuple
+
+from utils.exceptions import RateLimitException
+
+
+class RateLimiter:
+    """Sliding-window limiter enforcing every (max_events, window_seconds) rule per key"""
+    
+    def __init__(self, rules: List[Tuple[int, int]], message: str = "Too many attempts"):
+        self.rules = sorted(rules, key=lambda rule: rule[1])
+        self.message = message
+        self._max_window = self.rules[-1][1]
+        self._events: Dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + self._max_window
+    
+    def hit(self, key: Hashable):
+        """Record one event for key, raising RateLimitException if any rule is exceeded"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            events = self._events.setdefault(key, deque())
+            while events and now - events[0] >= self._max_window:
+                events.popleft()
+            
+            retry_after = self._retry_after(events, now)
+            if retry_after:
+                raise RateLimitException(
+                    f"{self.message}. Please retry in {retry_after}s.", retry_after=retry_after
+                )
+            events.append(now)
+    
+    def reset(self, key: Hashable):
+        """Forget all events recorded for key"""
+        with self._lock:
+            self._events.pop(key, None)
+    
+    def _sweep(self, now: float):
+        """Drop keys whose events have all left the longest window (caller holds the lock)"""
+        stale = [key for key, events in self._events.items()
+                 if not events or now - events[-1] >= self._max_window]
+        for key in stale:
+            del self._events[key]
+        self._next_sweep = now + self._max_window
+    
+    def _retry_after(self, events: deque, now: float) -> int:
+        """Seconds until every rule admits another event (0 if allowed now)"""
+        wait = 0.0
+        for max_events, window in self.rules:
+            in_window = [t for t in events if now - t < window]
+            if len(in_window) >= max_events:
+                # The oldest event that must expire before one more is allowed
+                wait = max(wait, window - (now - in_window[-max_events]))
+        return int(wait) + 1 if wait > 0 else 0
@@ -0,0 +1,175 @@
+"""
+Shared service and repository instances for Streamlit pages.
+Each factory is cached with st.cache_resource so reruns reuse one object graph.
+"""
+
+import streamlit as st
+
+from utils.formatters import format_currency
+
+
+@st.cache_resource
+def get_auth_service():
+    """Return the shared AuthenticationService."""
+    from core.services.authentication_service import AuthenticationService
+    return AuthenticationService()
+
+
+@st.cache_resource
+def get_account_service():
+    """Return the shared AccountService."""
+    from core.services.account_service import AccountService
+    return AccountService()
+
+
+@st.cache_resource
+def get_txn_service():
+    """Return the shared TransactionService."""
+    from core.services.transaction_service import TransactionService
+    return TransactionService()
+
+
+@st.cache_resource
+def get_loan_service():
+    """Return the shared LoanService."""
+    from core.services.loan_service import LoanService
+    return LoanService()
+
+
+@st.cache_resource
+def get_investment_service():
+    """Return the shared InvestmentService."""
+    from core.services.investment_service import InvestmentService
+    return InvestmentService()
+
+
+@st.cache_resource
+def get_cust_repo():
+    """Return the shared CustomerRepository."""
+    from core.repositories.customer_repository import CustomerRepository
+    return CustomerRepository()
+
+
+@st.cache_resource
+def get_user_repo():
+    """Return the shared UserRepository."""
+    from core.repositories.user_repository import UserRepository
+    return UserRepository()
+
+
+@st.cache_resource
+def get_audit_service():
+    """Return the shared AuditService."""
+    from core.services.audit_service import AuditService
+    return AuditService()
+
+
+# ---------------------------------------------------------------
+# Cached read models (short TTL; clear after writes that affect them)
+# ---------------------------------------------------------------
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_pending_users():
+    """Users awaiting KYC approval."""
+    return get_auth_service().user_repo.get_pending_registrations()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_low_balance_accounts():
+    """Active accounts below their minimum balance."""
+    return get_account_service().get_low_balance_accounts()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_customer_accounts(user_id: int):
+    """Active account summaries for a customer (transfer/statement pickers)."""
+    return get_account_service().get_customer_accounts(user_id)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_account_options(user_id: int):
+    """'Account Number (Balance)' -> account_id map for account pickers."""
+    return {
+        f"{a['account_number']} ({format_currency(a['balance'])})": a['account_id']
+        for a in load_customer_accounts(user_id)
+    }
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_linked_account_options(user_id: int):
+    """'#ID - Account Number (Type)' -> account_id map for the loan account picker."""
+    return {
+        f"#{a['account_id']} - {a['account_number']} ({a['account_type'].title()})": a['account_id']
+        for a in load_customer_accounts(user_id)
+    }
+
+
+def invalidate_customer_accounts():
+    """Drop cached account lists and picker options after balance/status changes."""
+    load_customer_accounts.clear()
+    load_account_options.clear()
+    load_linked_account_options.clear()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_customer_info(user_id: int):
+    """Customer profile for the Profile page."""
+    return get_cust_repo().find_customer_by_id(user_id)
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_user_page(page: int, page_size: int = 25):
+    """One page of system users plus the total user count."""
+    repo = get_user_repo()
+    return repo.get_page((page - 1) * page_size, page_size), repo.count_all()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_audit_logs(limit: int = 50):
+    """Most recent audit log entries."""
+    return get_audit_service().get_latest_activity(limit)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_all_loans():
+    """Every loan in the system (admin view)."""
+    return get_loan_service().get_all_loans()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_user_loans(user_id: int):
+    """Loans belonging to one customer."""
+    return get_loan_service().get_loans_for_user(user_id)
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_pending_loans():
+    """Loan applications awaiting admin approval."""
+    return get_loan_service().loan_repo.get_pending_approvals()
+
+
+def invalidate_loans():
+    """Drop cached loan lists after an application, approval or rejection."""
+    load_all_loans.clear()
+    load_user_loans.clear()
+    load_pending_loans.clear()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_all_deposits():
+    """Every FD and RD in the system (admin view), as (fds, rds)."""
+    inv = get_investment_service()
+    return inv.get_all_fds(), inv.get_all_rds()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_user_deposits(user_id: int):
+    """FDs and RDs belonging to one customer, as (fds, rds)."""
+    inv = get_investment_service()
+    return inv.get_fds_for_user(user_id), inv.get_rds_for_user(user_id)
+
+
+def invalidate_deposits():
+    """Drop cached deposit lists after an FD or RD is opened."""
+    load_all_deposits.clear()
+    load_user_deposits.clear()
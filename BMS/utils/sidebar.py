@@ -7,6 +7,19 @@ Conditionally shows navigation links based on user role.
 import streamlit as st
 from utils.auth_guard import handle_logout, get_current_user, is_admin, is_customer
 
+_ROLE_LABELS = {
+    "customer": "Customer",
+    "admin": "Admin",
+}
+
+# registration_status -> (label, badge) for accounts that are not yet active
+_STATUS_INFO = {
+    "pending_verification": ("Pending Verification", "[Pending Verification]"),
+    "pending_kyc": ("Pending KYC", "[Pending KYC]"),
+    "blocked": ("Blocked", "[Blocked]"),
+    "rejected": ("Rejected", "[Rejected]"),
+}
+
 
 def render_sidebar():
     """Render the common sidebar on every authenticated page."""
@@ -17,19 +30,17 @@ def render_sidebar():
         sd = get_current_user()
         if sd:
             st.markdown(f"**{sd.get('username', 'User')}**")
-            role = sd.get("role", "customer").replace("_", " ").title()
+            role = sd.get("role", "customer")
+            role = _ROLE_LABELS.get(role) or role.replace("_", " ").title()
             st.caption(f"Role: {role}")
 
             # Show approval status badge if not active
             approval_status = sd.get("registration_status", "active")
             if approval_status != "active":
-                status_label = {
-                    "pending_verification": "[Pending Verification]",
-                    "pending_kyc": "[Pending KYC]",
-                    "blocked": "[Blocked]",
-                    "rejected": "[Rejected]"
-                }.get(approval_status, "[Unknown]")
-                st.caption(f"Status: {approval_status.replace('_', ' ').title()} {status_label}")
+                label, badge = _STATUS_INFO.get(approval_status) or (
+                    approval_status.replace("_", " ").title(), "[Unknown]"
+                )
+                st.caption(f"Status: {label} {badge}")
 
             st.markdown("---")
 
@@ -4,212 +4,298 @@ Provides validation functions for banking system inputs
 """
 
 import re
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from utils.exceptions import ValidationException
+from utils.helpers import SecurityUtils, PW_UPPER, PW_LOWER, PW_DIGIT, PW_SPECIAL
+
+# Compiled once at import; the validators run on every login, transfer and registration
+_ACCOUNT_RE = re.compile(r'^[A-Za-z0-9]{6,20}$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NAME_RE = re.compile(r"^[a-zA-Z\s.']+$")
+_TXN_REF_RE = re.compile(r'^[A-Za-z0-9\-_]+$')
+
+_TWO_PLACES = Decimal('0.01')
+
+# Loan eligibility thresholds
+_MAX_EMI_RATIO = Decimal('50.0')   # Maximum EMI ratio: 50% of income
+_MIN_CREDIT = 650                  # Minimum credit score
+_HARD_REJECT_CREDIT = 500          # Below this, income is not worth evaluating
+
+def _ensure(result: Tuple[bool, Optional[str]]) -> bool:
+    """Raise ValidationException for a failed (ok, message) check result"""
+    ok, message = result
+    if not ok:
+        raise ValidationException(message)
+    return True
 
 class BankingValidator:
     """Validation utilities for banking operations"""
     
     @staticmethod
-    def validate_amount(amount: Decimal, min_amount: Decimal = None, max_amount: Decimal = None) -> bool:
-        """Validate monetary amount"""
+    def _check_amount(amount: Decimal, min_amount: Decimal = None, max_amount: Decimal = None) -> Tuple[bool, Optional[str]]:
+        """Validate monetary amount; returns (ok, error message)"""
         if not isinstance(amount, Decimal):
-            raise ValidationException("Amount must be a Decimal")
+            return False, "Amount must be a Decimal"
         
         if amount <= 0:
-            raise ValidationException("Amount must be positive")
+            return False, "Amount must be positive"
         
         if min_amount and amount < min_amount:
-            raise ValidationException(f"Amount must be at least {min_amount}")
+            return False, f"Amount must be at least {min_amount}"
         
         if max_amount and amount > max_amount:
-            raise ValidationException(f"Amount cannot exceed {max_amount}")
+            return False, f"Amount cannot exceed {max_amount}"
         
-        # Check decimal places (max 2 for currency)
-        if amount.as_tuple().exponent < -2:
-            raise ValidationException("Amount cannot have more than 2 decimal places")
+        # Check decimal places (max 2 for currency); trailing zeros are fine
+        try:
+            too_precise = amount != amount.quantize(_TWO_PLACES)
+        except InvalidOperation:  # too many digits to quantize at the context precision
+            too_precise = amount.as_tuple().exponent < -2
+        if too_precise:
+            return False, "Amount cannot have more than 2 decimal places"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_account_number(account_number: str) -> bool:
-        """Validate account number format"""
+    def validate_amount(amount: Decimal, min_amount: Decimal = None, max_amount: Decimal = None) -> bool:
+        """Validate monetary amount"""
+        return _ensure(BankingValidator._check_amount(amount, min_amount, max_amount))
+    
+    @staticmethod
+    def _check_account_number(account_number: str) -> Tuple[bool, Optional[str]]:
+        """Validate account number format; returns (ok, error message)"""
         if not account_number:
-            raise ValidationException("Account number is required")
+            return False, "Account number is required"
         
         if not isinstance(account_number, str):
-            raise ValidationException("Account number must be a string")
+            return False, "Account number must be a string"
         
         # Account number should be alphanumeric, 6-20 characters
-        if not re.match(r'^[A-Za-z0-9]{6,20}$', account_number):
-            raise ValidationException("Account number must be 6-20 alphanumeric characters")
+        if not _ACCOUNT_RE.match(account_number):
+            return False, "Account number must be 6-20 alphanumeric characters"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_phone(phone: str) -> bool:
-        """Validate phone number"""
+    def validate_account_number(account_number: str) -> bool:
+        """Validate account number format"""
+        return _ensure(BankingValidator._check_account_number(account_number))
+    
+    @staticmethod
+    def _check_phone(phone: str) -> Tuple[bool, Optional[str]]:
+        """Validate phone number; returns (ok, error message)"""
         if not phone:
-            raise ValidationException("Phone number is required")
+            return False, "Phone number is required"
         
-        # Indian phone number format: 10 digits
-        if not re.match(r'^[6-9]\d{9}$', phone):
-            raise ValidationException("Phone number must be 10 digits starting with 6-9")
+        # Indian phone number format: 10 ASCII digits starting with 6-9
+        if len(phone) != 10 or phone[0] not in '6789' or not (phone.isascii() and phone.isdigit()):
+            return False, "Phone number must be 10 digits starting with 6-9"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_email(email: str) -> bool:
-        """Validate email address"""
+    def validate_phone(phone: str) -> bool:
+        """Validate phone number"""
+        return _ensure(BankingValidator._check_phone(phone))
+    
+    @staticmethod
+    def _check_email(email: str) -> Tuple[bool, Optional[str]]:
+        """Validate email address; returns (ok, error message)"""
         if not email:
-            return True  # Email is optional
+            return True, None  # Email is optional
         
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            raise ValidationException("Invalid email format")
+        if not _EMAIL_RE.match(email):
+            return False, "Invalid email format"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_name(name: str, field_name: str = "Name") -> bool:
-        """Validate person name"""
+    def validate_email(email: str) -> bool:
+        """Validate email address"""
+        return _ensure(BankingValidator._check_email(email))
+    
+    @staticmethod
+    def _check_name(name: str, field_name: str = "Name") -> Tuple[bool, Optional[str]]:
+        """Validate person name; returns (ok, error message)"""
         if not name:
-            raise ValidationException(f"{field_name} is required")
+            return False, f"{field_name} is required"
         
         if not isinstance(name, str):
-            raise ValidationException(f"{field_name} must be a string")
+            return False, f"{field_name} must be a string"
         
-        if len(name.strip()) < 2:
-            raise ValidationException(f"{field_name} must be at least 2 characters")
+        stripped = name.strip()
+        if len(stripped) < 2:
+            return False, f"{field_name} must be at least 2 characters"
         
-        if len(name.strip()) > 100:
-            raise ValidationException(f"{field_name} cannot exceed 100 characters")
+        if len(stripped) > 100:
+            return False, f"{field_name} cannot exceed 100 characters"
         
         # Allow letters, spaces, dots, apostrophes
-        if not re.match(r"^[a-zA-Z\s.']+$", name.strip()):
-            raise ValidationException(f"{field_name} can only contain letters, spaces, dots, and apostrophes")
+        if not _NAME_RE.match(stripped):
+            return False, f"{field_name} can only contain letters, spaces, dots, and apostrophes"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_password(password: str) -> bool:
-        """Validate password strength"""
+    def validate_name(name: str, field_name: str = "Name") -> bool:
+        """Validate person name"""
+        return _ensure(BankingValidator._check_name(name, field_name))
+    
+    @staticmethod
+    def _check_password(password: str) -> Tuple[bool, Optional[str]]:
+        """Validate password strength; returns (ok, error message)"""
         if not password:
-            raise ValidationException("Password is required")
+            return False, "Password is required"
         
         if len(password) < 8:
-            raise ValidationException("Password must be at least 8 characters")
+            return False, "Password must be at least 8 characters"
         
         if len(password) > 128:
-            raise ValidationException("Password cannot exceed 128 characters")
+            return False, "Password cannot exceed 128 characters"
         
         # Check for at least one uppercase, lowercase, digit, and special character
-        if not re.search(r'[A-Z]', password):
-            raise ValidationException("Password must contain at least one uppercase letter")
+        classes = SecurityUtils.password_char_classes(password)
+        if not classes & PW_UPPER:
+            return False, "Password must contain at least one uppercase letter"
         
-        if not re.search(r'[a-z]', password):
-            raise ValidationException("Password must contain at least one lowercase letter")
+        if not classes & PW_LOWER:
+            return False, "Password must contain at least one lowercase letter"
         
-        if not re.search(r'\d', password):
-            raise ValidationException("Password must contain at least one digit")
+        if not classes & PW_DIGIT:
+            return False, "Password must contain at least one digit"
         
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            raise ValidationException("Password must contain at least one special character")
+        if not classes & PW_SPECIAL:
+            return False, "Password must contain at least one special character"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_date_of_birth(dob: date) -> bool:
-        """Validate date of birth"""
+    def validate_password(password: str) -> bool:
+        """Validate password strength"""
+        return _ensure(BankingValidator._check_password(password))
+    
+    @staticmethod
+    def _check_date_of_birth(dob: date) -> Tuple[bool, Optional[str]]:
+        """Validate date of birth; returns (ok, error message)"""
         if not dob:
-            raise ValidationException("Date of birth is required")
+            return False, "Date of birth is required"
         
         if not isinstance(dob, date):
-            raise ValidationException("Date of birth must be a date object")
+            return False, "Date of birth must be a date object"
         
         today = date.today()
         age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
         
         if age < 18:
-            raise ValidationException("Customer must be at least 18 years old")
+            return False, "Customer must be at least 18 years old"
         
         if age > 120:
-            raise ValidationException("Invalid date of birth")
+            return False, "Invalid date of birth"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_tenure(tenure_months: int, min_tenure: int = 1, max_tenure: int = 360) -> bool:
-        """Validate loan/deposit tenure"""
+    def validate_date_of_birth(dob: date) -> bool:
+        """Validate date of birth"""
+        return _ensure(BankingValidator._check_date_of_birth(dob))
+    
+    @staticmethod
+    def _check_tenure(tenure_months: int, min_tenure: int = 1, max_tenure: int = 360) -> Tuple[bool, Optional[str]]:
+        """Validate loan/deposit tenure; returns (ok, error message)"""
         if not isinstance(tenure_months, int):
-            raise ValidationException("Tenure must be an integer")
+            return False, "Tenure must be an integer"
         
         if tenure_months < min_tenure:
-            raise ValidationException(f"Tenure must be at least {min_tenure} months")
+            return False, f"Tenure must be at least {min_tenure} months"
         
         if tenure_months > max_tenure:
-            raise ValidationException(f"Tenure cannot exceed {max_tenure} months")
+            return False, f"Tenure cannot exceed {max_tenure} months"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_interest_rate(rate: Decimal, min_rate: Decimal = Decimal('0.1'), max_rate: Decimal = Decimal('50.0')) -> bool:
-        """Validate interest rate"""
+    def validate_tenure(tenure_months: int, min_tenure: int = 1, max_tenure: int = 360) -> bool:
+        """Validate loan/deposit tenure"""
+        return _ensure(BankingValidator._check_tenure(tenure_months, min_tenure, max_tenure))
+    
+    @staticmethod
+    def _check_interest_rate(rate: Decimal, min_rate: Decimal = Decimal('0.1'), max_rate: Decimal = Decimal('50.0')) -> Tuple[bool, Optional[str]]:
+        """Validate interest rate; returns (ok, error message)"""
         if not isinstance(rate, Decimal):
-            raise ValidationException("Interest rate must be a Decimal")
+            return False, "Interest rate must be a Decimal"
         
         if rate < min_rate:
-            raise ValidationException(f"Interest rate must be at least {min_rate}%")
+            return False, f"Interest rate must be at least {min_rate}%"
         
         if rate > max_rate:
-            raise ValidationException(f"Interest rate cannot exceed {max_rate}%")
+            return False, f"Interest rate cannot exceed {max_rate}%"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_credit_score(score: int) -> bool:
-        """Validate credit score"""
+    def validate_interest_rate(rate: Decimal, min_rate: Decimal = Decimal('0.1'), max_rate: Decimal = Decimal('50.0')) -> bool:
+        """Validate interest rate"""
+        return _ensure(BankingValidator._check_interest_rate(rate, min_rate, max_rate))
+    
+    @staticmethod
+    def _check_credit_score(score: int) -> Tuple[bool, Optional[str]]:
+        """Validate credit score; returns (ok, error message)"""
         if not isinstance(score, int):
-            raise ValidationException("Credit score must be an integer")
+            return False, "Credit score must be an integer"
         
         if score < 300 or score > 850:
-            raise ValidationException("Credit score must be between 300 and 850")
+            return False, "Credit score must be between 300 and 850"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_otp(otp: str) -> bool:
-        """Validate OTP format"""
+    def validate_credit_score(score: int) -> bool:
+        """Validate credit score"""
+        return _ensure(BankingValidator._check_credit_score(score))
+    
+    @staticmethod
+    def _check_otp(otp: str) -> Tuple[bool, Optional[str]]:
+        """Validate OTP format; returns (ok, error message)"""
         if not otp:
-            raise ValidationException("OTP is required")
+            return False, "OTP is required"
         
         if not isinstance(otp, str):
-            raise ValidationException("OTP must be a string")
+            return False, "OTP must be a string"
         
-        if not re.match(r'^\d{6}$', otp):
-            raise ValidationException("OTP must be exactly 6 digits")
+        if len(otp) != 6 or not (otp.isascii() and otp.isdigit()):
+            return False, "OTP must be exactly 6 digits"
         
-        return True
+        return True, None
     
     @staticmethod
-    def validate_transaction_reference(reference: str) -> bool:
-        """Validate transaction reference number"""
+    def validate_otp(otp: str) -> bool:
+        """Validate OTP format"""
+        return _ensure(BankingValidator._check_otp(otp))
+    
+    @staticmethod
+    def _check_transaction_reference(reference: str) -> Tuple[bool, Optional[str]]:
+        """Validate transaction reference number; returns (ok, error message)"""
         if not reference:
-            raise ValidationException("Transaction reference is required")
+            return False, "Transaction reference is required"
         
         if not isinstance(reference, str):
-            raise ValidationException("Transaction reference must be a string")
+            return False, "Transaction reference must be a string"
         
         if len(reference) < 6 or len(reference) > 50:
-            raise ValidationException("Transaction reference must be 6-50 characters")
+            return False, "Transaction reference must be 6-50 characters"
         
         # Alphanumeric with some special characters allowed
-        if not re.match(r'^[A-Za-z0-9\-_]+$', reference):
-            raise ValidationException("Transaction reference can only contain letters, numbers, hyphens, and underscores")
+        if not _TXN_REF_RE.match(reference):
+            return False, "Transaction reference can only contain letters, numbers, hyphens, and underscores"
         
-        return True
+        return True, None
+    
+    @staticmethod
+    def validate_transaction_reference(reference: str) -> bool:
+        """Validate transaction reference number"""
+        return _ensure(BankingValidator._check_transaction_reference(reference))
 
 class BusinessRuleValidator:
     """Business rule validation for banking operations"""
@@ -243,29 +329,34 @@ class BusinessRuleValidator:
     def validate_loan_eligibility(monthly_income: Decimal, existing_emi: Decimal, 
                                 requested_emi: Decimal, credit_score: int) -> Dict[str, Any]:
         """Validate loan eligibility based on income and credit score"""
-        total_emi = existing_emi + requested_emi
-        emi_ratio = (total_emi / monthly_income) * 100
+        credit_reason = f"Credit score ({credit_score}) below minimum required ({_MIN_CREDIT})"
         
-        # Maximum EMI ratio: 50% of income
-        max_emi_ratio = Decimal('50.0')
+        # Clearly unacceptable scores are rejected before any income arithmetic
+        if credit_score < _HARD_REJECT_CREDIT:
+            return {
+                'eligible': False,
+                'emi_ratio': None,
+                'reasons': [credit_reason],
+                'max_loan_amount': Decimal('0')
+            }
         
-        # Minimum credit score: 650
-        min_credit_score = 650
+        total_emi = existing_emi + requested_emi
+        emi_ratio = (total_emi / monthly_income) * 100
         
         eligible = True
         reasons = []
         
-        if emi_ratio > max_emi_ratio:
+        if emi_ratio > _MAX_EMI_RATIO:
             eligible = False
-            reasons.append(f"EMI ratio ({emi_ratio:.1f}%) exceeds maximum allowed ({max_emi_ratio}%)")
+            reasons.append(f"EMI ratio ({emi_ratio:.1f}%) exceeds maximum allowed ({_MAX_EMI_RATIO}%)")
         
-        if credit_score < min_credit_score:
+        if credit_score < _MIN_CREDIT:
             eligible = False
-            reasons.append(f"Credit score ({credit_score}) below minimum required ({min_credit_score})")
+            reasons.append(credit_reason)
         
         return {
             'eligible': eligible,
             'emi_ratio': emi_ratio,
             'reasons': reasons,
-            'max_loan_amount': monthly_income * max_emi_ratio / 100 * 12 * 5  # Rough estimate
+            'max_loan_amount': monthly_income * _MAX_EMI_RATIO / 100 * 12 * 5  # Rough estimate
         }
\ No newline at end of file